@@ -1,21 +1,182 @@
 import argparse
+import hashlib
 import json
 import logging
+import mmap
 import os
+import re
+import sqlite3
+import threading
 import time
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
+from itertools import islice
+from functools import cached_property
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, BinaryIO, Deque, Dict, FrozenSet, List, Optional, Tuple, Union
 
 import requests
 from dotenv import load_dotenv
 from requests.adapters import HTTPAdapter
 from urllib3.util import Retry
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
 load_dotenv()
 
 CLICKUP_API_BASE = "https://api.clickup.com/api/v2"
+# Сколько параллельных запросов к ClickUp допускаем при пакетной загрузке
+CLICKUP_PARALLEL_REQUESTS = 8
+# ClickUp отдаёт список задач страницами по 100 штук
+CLICKUP_PAGE_SIZE = 100
+CLICKUP_SPECULATIVE_PAGES = 4
+# Пул соединений общей HTTP-сессии: хосты ClickUp и LM Studio, до 32 соединений на хост
+HTTP_POOL_HOSTS = 4
+HTTP_POOL_SIZE = 32
+# LM Studio обычно обслуживает одну модель и всё равно ставит лишние запросы
+# в очередь; по умолчанию в неё одновременно уходят не больше двух запросов.
+DEFAULT_LM_CONCURRENCY = 2
+# Оценка модели для неизменившегося промпта переиспользуется в течение 30 дней
+ASSESSMENT_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+JSON_DECODER = json.JSONDecoder()
+SORT_KEY_MISSING = 2**63 - 1
+MS_PER_DAY = 24 * 60 * 60 * 1000
+# Строковые значения, которые модель использует для булевых полей
+TRUE_TOKENS = frozenset({"true", "yes", "y", "1"})
+FALSE_TOKENS = frozenset({"false", "no", "n", "0"})
+# Ответ модели в markdown-блоке: ```json\n...\n```
+JSON_FENCE_RE = re.compile(r"```[^\n]*(?:\n(.*?))??(?:\n[ \t]*```[^\n]*)?", re.DOTALL)
+# Строка истории вида «<!-- {...} -->» с JSON-записью оценки
+HISTORY_RECORD_RE = re.compile(rb"^[ \t]*<!--(.*?)-->[ \t\r]*$", re.MULTILINE)
+# Откуда брать имя исполнителя — в порядке приоритета
+ASSIGNEE_NAME_KEYS = ("username", "email", "user", "id")
+# Длинные описания обрезаются: время ответа локальной модели растёт с длиной промпта
+MAX_DESCRIPTION_CHARS = 1500
+# Как часто сверять mtime/размер файла истории на случай записи другим процессом
+HISTORY_STAT_INTERVAL_SECONDS = 1.0
+
+
+def loads_json(data: Union[bytes, str]) -> Any:
+    # orjson заметно быстрее на больших ответах ClickUp и LM Studio
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+# Системный промпт неизменен между задачами: собираем его один раз при импорте
+LM_SYSTEM_PROMPT = (
+    "Ты ИИ-эксперт по оценке эффективности выполнения задач. "
+    "Твоя роль — объективно проанализировать задачу, внимательно изучив её контекст, "
+    "и предоставить независимую оценку скорости и качества.\n\n"
+    "МЕТОДОЛОГИЯ ОЦЕНКИ:\n\n"
+    "1. ОЦЕНКА СКОРОСТИ (1-5):\n"
+    "Рассчитай коэффициент K = Фактическое время / Плановое время\n"
+    "• 5 баллов: K ≤ 0,70 (выполнено на 30%+ быстрее плана, без ущерба качеству)\n"
+    "• 4 балла: K = 0,71-1,00 (в срок или с небольшим опережением)\n"
+    "• 3 балла: K = 1,01-1,30 (небольшое превышение до 30%, не критично)\n"
+    "• 2 балла: K = 1,31-1,60 (существенное превышение 31-60%, влияет на другие задачи)\n"
+    "• 1 балл: K > 1,60 (критическое превышение >60%, срыв дедлайна)\n\n"
+    "2. ОЦЕНКА КАЧЕСТВА (1-5):\n"
+    "• 5 баллов: 0 ошибок, 0 доработок, принято сразу, превосходит ожидания\n"
+    "• 4 балла: 1-2 незначительных замечания, исправлено быстро (<10% времени)\n"
+    "• 3 балла: 3-5 ошибок, доработка 10-30% времени, один раунд исправлений\n"
+    "• 2 балла: >5 ошибок или критичные, переработка 30-50% времени, несколько раундов\n"
+    "• 1 балл: критические ошибки, требуется полная переделка (>50% времени)\n\n"
+    "3. КОНТЕКСТНЫЙ АНАЛИЗ:\n"
+    "• Сравни текущую оценку со средним историческим баллом исполнителя\n"
+    "• Учитывай категорию исполнителя (эксперт/профессионал/развивающийся/проблемный)\n"
+    "• Определи тренд: прогресс (+), стабильность (=), или регресс (-)\n"
+    "• Для экспертов ожидания выше, для развивающихся — учитывай прогресс\n\n"
+    "4. ИИ-ОЦЕНКА ОПТИМАЛЬНОГО ВРЕМЕНИ:\n"
+    "• Проанализируй описание и тип задачи\n"
+    "• Оцени, сколько времени ДОЛЖНА была занять эта конкретная задача для специалиста данного уровня на основе всех доступных деталей\n"
+    "• Сравни с плановым временем: было ли оно реалистичным?\n"
+    "• Сравни с фактическим временем: насколько эффективно работал исполнитель?\n\n"
+    "ФОРМАТ ОТВЕТА:\n"
+    "Верни строго JSON с ключами:\n"
+    '• "speed_score": целое число 1-5\n'
+    '• "quality_score": целое число 1-5\n'
+    '• "speed_reason": краткое пояснение (до 50 слов) на русском\n'
+    '• "quality_reason": краткое пояснение (до 50 слов) на русском\n'
+    '• "optimal_time_minutes": твоя оценка оптимального времени для этой задачи\n'
+    '• "time_estimate_realistic": true/false — было ли плановое время реалистичным\n'
+    '• "context_adjustment": число от -1 до +1 — рекомендуемая корректировка на основе истории\n'
+    '• "trend": "progress" / "stable" / "regression" — тренд относительно истории\n'
+    '• "performer_level_match": true/false — соответствует ли результат уровню исполнителя\n\n'
+    "Будь объективным, учитывай все факторы, предоставляй конструктивную обратную связь."
+)
+LM_SYSTEM_MESSAGE = {"role": "system", "content": LM_SYSTEM_PROMPT}
+
+# Пользовательская часть промпта; подставляется через str.format
+LM_USER_PROMPT_TEMPLATE = (
+    "ЗАДАЧА НА ОЦЕНКУ:\n\n"
+    "Название: {title}\n"
+    "Описание: {task_summary}\n"
+    "Тип задачи: {task_type}\n"
+    "Приоритет: {priority}\n\n"
+    "ВРЕМЕННЫЕ ПОКАЗАТЕЛИ:\n"
+    "Плановое время (estimate): {planned} минут\n"
+    "Фактическое время (tracked): {tracked} минут\n"
+    "Коэффициент K: {time_coefficient}\n"
+    "Дедлайн: {due}\n"
+    "Статус дедлайна: {deadline_status}\n\n"
+    "ПОКАЗАТЕЛИ КАЧЕСТВА:\n"
+    "Количество ошибок: {errors_count}\n"
+    "Время на доработки: {rework_time} минут\n"
+    "Статус приемки: {acceptance_status}\n"
+    "Количество комментариев: {comments_count}\n"
+    "Количество изменений (activity): {activity_count}\n\n"
+    "ИСПОЛНИТЕЛЬ:\n"
+    "Имя: {assignee_name}\n"
+    "Роль/Специализация: {assignee_role}\n"
+    "Категория: {performer_category}\n"
+    "Средний исторический балл: {avg_score}\n"
+    "Средний балл скорости (история): {avg_speed}\n"
+    "Средний балл качества (история): {avg_quality}\n"
+    "{history_section}\n\n"
+    "ТВОЯ ЗАДАЧА:\n"
+    "1. Оцени СКОРОСТЬ выполнения (1-5) на основе коэффициента K и контекста\n"
+    "2. Оцени КАЧЕСТВО результата (1-5) на основе ошибок, доработок и приемки\n"
+    "3. Определи ОПТИМАЛЬНОЕ ВРЕМЯ для этой задачи по твоему профессиональному мнению\n"
+    "4. Оцени, было ли плановое время реалистичным\n"
+    "5. Сравни с историей исполнителя и определи тренд (прогресс/стабильность/регресс)\n"
+    "6. Предложи контекстную корректировку (-1 до +1) на основе истории и категории\n"
+    "7. Оцени, соответствует ли результат уровню профессионализма исполнителя\n"
+    "8. Если у задачи есть плановое или фактическое время, подчеркни, "
+    "что расчёт оптимального времени выполнялся индивидуально для этой карточки\n\n"
+    "Ответь строго в JSON формате:\n"
+    '{{\n'
+    '  "speed_score": 4,\n'
+    '  "quality_score": 5,\n'
+    '  "speed_reason": "Задача выполнена точно в срок (K=0.95), что соответствует плану...",\n'
+    '  "quality_reason": "Работа принята с первого раза без замечаний, 0 ошибок...",\n'
+    '  "optimal_time_minutes": 180,\n'
+    '  "time_estimate_realistic": true,\n'
+    '  "context_adjustment": 0.3,\n'
+    '  "trend": "progress",\n'
+    '  "performer_level_match": true\n'
+    '}}'
+)
+
+# Пакетный режим: несколько задач в одном запросе, ответ — JSON-массив в том же порядке
+LM_BATCH_PROMPT_TEMPLATE = (
+    "Ниже {count} задач на оценку. Оцени каждую независимо от остальных "
+    "по той же методологии.\n"
+    "Ответь строго JSON-массивом из {count} объектов в том же порядке, что и задачи; "
+    "каждый объект — в JSON формате, указанном в задаче.\n\n"
+    "{tasks}"
+)
 
 
 class ConfigError(RuntimeError):
@@ -38,18 +199,28 @@ class AgentConfig:
     max_tasks: Optional[int] = None
     history_log_path: str = "reports/assessments.md"
     history_limit: int = 5
-
-    @property
-    def normalized_target_statuses(self) -> Optional[List[str]]:
+    concurrency: int = 6
+    lm_batch_size: int = 1
+    lm_concurrency: int = DEFAULT_LM_CONCURRENCY
+    cache_dir: str = "reports/.cache"
+    use_cache: bool = True
+
+    # Нормализованные статусы вычисляются один раз: проверки идут для каждой задачи
+    @cached_property
+    def normalized_target_statuses(self) -> Optional[FrozenSet[str]]:
         if not self.target_statuses:
             return None
-        return [status.strip().lower() for status in self.target_statuses if status.strip()]
+        return frozenset(
+            status.strip().lower() for status in self.target_statuses if status.strip()
+        )
 
-    @property
-    def normalized_auto_close_statuses(self) -> Optional[List[str]]:
+    @cached_property
+    def normalized_auto_close_statuses(self) -> Optional[FrozenSet[str]]:
         if not self.auto_close_statuses:
             return None
-        return [status.strip().lower() for status in self.auto_close_statuses if status.strip()]
+        return frozenset(
+            status.strip().lower() for status in self.auto_close_statuses if status.strip()
+        )
 
     @property
     def api_target_statuses(self) -> Optional[List[str]]:
@@ -73,6 +244,113 @@ class AssessmentResult:
     performer_level_match: Optional[bool] = None
 
 
+class _JsonObjectTracker:
+    """Следит за балансом фигурных скобок в потоке текста с учётом строк JSON."""
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, chunk: str) -> Optional[int]:
+        """Возвращает позицию сразу за закрывающей скобкой первого JSON-объекта в чанке."""
+
+        for index, char in enumerate(chunk):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == "{":
+                self.depth += 1
+                self.started = True
+            elif not self.started:
+                continue
+            elif char == '"':
+                self.in_string = True
+            elif char == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    return index + 1
+        return None
+
+
+class PersistentCache:
+    """Кэш на SQLite, переживающий перезапуски агента. Безопасен для потоков."""
+
+    def __init__(self, path: Path, max_entries: int = 5000) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "namespace TEXT NOT NULL, "
+            "key TEXT NOT NULL, "
+            "version TEXT, "
+            "value TEXT NOT NULL, "
+            "stored_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+        self._connection.commit()
+
+    def get(
+        self,
+        namespace: str,
+        key: str,
+        version: Optional[str] = None,
+        max_age: Optional[float] = None,
+    ) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT version, value, stored_at FROM cache WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            stored_version, value, stored_at = row
+            if version is not None and stored_version != version:
+                return None
+            if max_age is not None and now - stored_at > max_age:
+                return None
+            self._connection.execute(
+                "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, namespace, key),
+            )
+            self._connection.commit()
+        return json.loads(value)
+
+    def set(self, namespace: str, key: str, value: Any, version: Optional[str] = None) -> None:
+        now = time.time()
+        serialized = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cache "
+                "(namespace, key, version, value, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, key, version, serialized, now, now),
+            )
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            # Вытесняем давно не использованные записи, чтобы файл не рос бесконечно
+            self._connection.execute(
+                "DELETE FROM cache WHERE rowid IN ("
+                "SELECT rowid FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self._max_entries,),
+            )
+            self._connection.commit()
+            self._connection.close()
+
+
 def build_config() -> AgentConfig:
     required = {
         "CLICKUP_API_TOKEN": os.getenv("CLICKUP_API_TOKEN"),
@@ -114,6 +392,11 @@ def build_config() -> AgentConfig:
     max_tasks_value = _int_or_default(os.getenv("CLICKUP_MAX_TASKS"), 0)
     max_tasks = max_tasks_value if max_tasks_value > 0 else None
     history_log_path = os.getenv("ASSESSMENT_HISTORY_PATH", "reports/assessments.md")
+    concurrency = max(1, _int_or_default(os.getenv("AGENT_CONCURRENCY"), 6))
+    lm_batch_size = max(1, _int_or_default(os.getenv("LM_BATCH_SIZE"), 1))
+    lm_concurrency_value = _int_or_default(os.getenv("LM_CONCURRENCY"), 0)
+    lm_concurrency = lm_concurrency_value if lm_concurrency_value > 0 else DEFAULT_LM_CONCURRENCY
+    cache_dir = os.getenv("AGENT_CACHE_DIR", "reports/.cache")
     return AgentConfig(
         api_token=required["CLICKUP_API_TOKEN"],
         list_id=list_id,
@@ -129,6 +412,10 @@ def build_config() -> AgentConfig:
         max_tasks=max_tasks,
         history_log_path=history_log_path,
         history_limit=history_limit,
+        concurrency=concurrency,
+        lm_batch_size=lm_batch_size,
+        lm_concurrency=lm_concurrency,
+        cache_dir=cache_dir,
     )
 
 
@@ -142,119 +429,331 @@ class ClickUpAgent:
             history_path = self.project_root / history_path
         self.history_path = history_path
         self.history_limit = max(0, self.config.history_limit)
+        self.concurrency = max(1, self.config.concurrency)
+        self.lm_batch_size = max(1, self.config.lm_batch_size)
+        # Сколько запросов одновременно уходит в LM Studio; остальные потоки
+        # в это время продолжают работать с ClickUp.
+        self.lm_concurrency = max(1, min(self.config.lm_concurrency, self.concurrency))
+        self._lm_slots = threading.BoundedSemaphore(self.lm_concurrency)
+        self._history_lock = threading.RLock()
+        self._history_records: Optional[Deque[Dict[str, Any]]] = None
+        self._history_stat: Optional[Tuple[int, int]] = None
+        self._history_checked_at = float("-inf")
+        self._history_handle: Optional[BinaryIO] = None
+        # Файл истории сжимается до history_limit записей, только когда
+        # в нём накопилось вдвое больше записей.
+        self._history_compact_threshold = 2 * self.history_limit
+        self._history_appends_since_prune = 0
+        self._history_prune_pending = False
+        self._history_by_assignee: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._history_averages_cache: Dict[
+            str, Tuple[Optional[float], Optional[float], Optional[float]]
+        ] = {}
+        # Одна сессия с общим пулом keep-alive соединений для ClickUp и LM Studio.
+        # Токен ClickUp передаётся только в запросах к ClickUp.
         self.session = self._build_retry_session(
             headers={
-                "Authorization": config.api_token,
                 "Content-Type": "application/json",
             }
         )
-        self.lm_session = self._build_retry_session(
-            headers={
-                "Content-Type": "application/json",
-            }
+        # Запросы к LM Studio повторяет _call_lm_completion со своей паузой, поэтому
+        # для её адреса urllib3 не повторяет запросы сам: иначе задержки складываются.
+        self.session.mount(
+            f"{self.config.lm_base_url.rstrip('/')}/v1/", self._build_http_adapter(max_retries=0)
         )
+        self.clickup_headers = {"Authorization": config.api_token}
+        self._lm_streaming = True
+        self._tick_now_ms: Optional[int] = None
         self._task_cache: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._task_fetch_lock = threading.Lock()
+        self._task_fetches: Dict[str, Future[Optional[Dict[str, Any]]]] = {}
+        self._context_cache: Dict[Tuple[str, str, bool], Tuple[str, Dict[str, Optional[int]]]] = {}
+        # Общий пул для коротких независимых запросов в рамках одной задачи.
+        # Задачи этого пула не ставят новых задач в пул и не ждут их.
+        self._io_executor = ThreadPoolExecutor(
+            max_workers=HTTP_POOL_SIZE, thread_name_prefix="clickup-io"
+        )
+        self.cache = self._open_cache() if self.config.use_cache else None
+
+    def _open_cache(self) -> Optional[PersistentCache]:
+        cache_dir = Path(self.config.cache_dir)
+        if not cache_dir.is_absolute():
+            cache_dir = self.project_root / cache_dir
+        try:
+            return PersistentCache(cache_dir / "agent_cache.sqlite3")
+        except (OSError, sqlite3.Error) as exc:
+            logging.warning("Не удалось открыть кэш %s, работаем без него: %s", cache_dir, exc)
+            return None
+
+    def close(self) -> None:
+        self._io_executor.shutdown(wait=True)
+        self._close_history_handle()
+        self.session.close()
+        if self.cache is None:
+            return
+        try:
+            self.cache.close()
+        except sqlite3.Error as exc:
+            logging.warning("Не удалось корректно закрыть кэш: %s", exc)
+        self.cache = None
 
     def run(self) -> None:
+        self._refresh_tick()
+        self._context_cache.clear()
+        self._history_checked_at = float("-inf")
         tasks = self._fetch_tasks()
         if not tasks:
             logging.info("Нет подходящих задач для обработки.")
             return
 
         logging.info("Получено задач из ClickUp: %s", len(tasks))
+        for task in tasks:
+            self._prepare_task(task)
         self._sort_tasks(tasks)
         prefetch_count = max(1, self.config.max_tasks or 1)
         self._prefetch_task_details(tasks[:prefetch_count])
+        try:
+            processed = self._process_tasks(tasks)
+        finally:
+            # Файл истории проверяется на сжатие один раз в конце запуска
+            self._prune_history_file()
+            self._close_history_handle()
+
+        logging.info("Готово. Обработано задач: %s", processed)
+
+    def _refresh_tick(self) -> None:
+        # Одно «сейчас» на запуск: сроки и возраст задач сравниваются с ним
+        self._tick_now_ms = time.time_ns() // 1_000_000
+
+    def _now_ms(self) -> int:
+        if self._tick_now_ms is not None:
+            return self._tick_now_ms
+        return time.time_ns() // 1_000_000
+
+    def _process_tasks(self, tasks: List[Dict[str, Any]]) -> int:
         processed = 0
-        for task in tasks:
-            if self.config.max_tasks and processed >= self.config.max_tasks:
-                break
+        max_tasks = self.config.max_tasks
+        pending_tasks = iter(tasks)
+        # Для каждой задачи «в работе» (или пачки задач) помним, сколько в ней задач
+        in_flight: Dict[Future[int], int] = {}
+        exhausted = False
+        # Задачи обрабатываются параллельно: пока модель думает над одной задачей,
+        # остальные потоки ходят в ClickUp. Лимит max_tasks учитывает задачи «в работе».
+        with ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="clickup-agent"
+        ) as executor:
+            while True:
+                while not exhausted and len(in_flight) < self.concurrency:
+                    chunk_size = self.lm_batch_size
+                    if max_tasks:
+                        chunk_size = min(
+                            chunk_size, max_tasks - processed - sum(in_flight.values())
+                        )
+                        if chunk_size <= 0:
+                            break
+                    chunk = list(islice(pending_tasks, chunk_size))
+                    if not chunk:
+                        exhausted = True
+                        break
+                    if len(chunk) == 1:
+                        future = executor.submit(self._process_task, chunk[0])
+                    else:
+                        future = executor.submit(self._process_task_batch, chunk)
+                    in_flight[future] = len(chunk)
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del in_flight[future]
+                    processed += int(future.result())
+        return processed
+
+    def _process_task(self, task: Dict[str, Any]) -> bool:
+        should_process, details = self._should_process_task(task)
+        if not should_process:
+            return False
 
-            if not self._should_process_task(task):
-                continue
+        logging.info("Обработка задачи %s", task["name"])
+        try:
+            assessment = self._get_assessment(task, details)
+            self._apply_assessment(task, assessment)
+        except Exception as exc:  # noqa: BLE001
+            logging.exception("Ошибка при обработке задачи %s: %s", task["id"], exc)
+            return False
+        return True
 
+    def _process_task_batch(self, tasks: List[Dict[str, Any]]) -> int:
+        eligible: List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]] = []
+        for task in tasks:
+            should_process, details = self._should_process_task(task)
+            if should_process:
+                eligible.append((task, details))
+        if not eligible:
+            return 0
+
+        assessments = self._get_assessments_batch(eligible)
+        processed = 0
+        for (task, details), assessment in zip(eligible, assessments):
             logging.info("Обработка задачи %s", task["name"])
             try:
-                assessment = self._get_assessment(task)
+                if assessment is None:
+                    assessment = self._get_assessment(task, details)
                 self._apply_assessment(task, assessment)
-                processed += 1
             except Exception as exc:  # noqa: BLE001
                 logging.exception("Ошибка при обработке задачи %s: %s", task["id"], exc)
-
-        logging.info("Готово. Обработано задач: %s", processed)
+                continue
+            processed += 1
+        return processed
 
     def _fetch_tasks(self) -> List[Dict[str, Any]]:
         tasks: List[Dict[str, Any]] = []
         page = 0
-
-        while True:
-            params = {
-                "page": page,
-                "subtasks": "true",
-                "include_closed": "true",
-            }
-            target_statuses = self.config.api_target_statuses
-            if target_statuses:
-                params["statuses[]"] = target_statuses
-                params["include_closed"] = "false"
-
-            url = self._tasks_endpoint()
-            response = self.session.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            payload = response.json()
-            current_tasks = payload.get("tasks", [])
-            if not current_tasks:
-                break
-
-            tasks.extend(current_tasks)
-
-            # Если задан лимит задач, не загружаем лишние страницы
-            if self.config.max_tasks is not None and len(tasks) >= self.config.max_tasks:
-                tasks = tasks[: self.config.max_tasks]
-                break
-            if not payload.get("last_page"):
-                page += 1
-            else:
-                break
+        params: Dict[str, Any] = {
+            "subtasks": "true",
+            "include_closed": "true",
+        }
+        target_statuses = self.config.api_target_statuses
+        if target_statuses:
+            params["statuses[]"] = target_statuses
+            params["include_closed"] = "false"
+        url = self._tasks_endpoint()
+
+        # При фильтре по статусам порядок выдачи стабилен, поэтому можно запрашивать
+        # несколько страниц наперёд и отбрасывать лишние после last_page.
+        pages_per_batch = CLICKUP_SPECULATIVE_PAGES if target_statuses else 1
+        if self.config.max_tasks is not None:
+            pages_needed = -(-self.config.max_tasks // CLICKUP_PAGE_SIZE)
+            pages_per_batch = max(1, min(pages_per_batch, pages_needed))
+
+        with ThreadPoolExecutor(
+            max_workers=pages_per_batch, thread_name_prefix="clickup-pages"
+        ) as executor:
+            finished = False
+            while not finished:
+                batch = range(page, page + pages_per_batch)
+                payloads = executor.map(lambda number: self._fetch_tasks_page(url, params, number), batch)
+                for payload in payloads:
+                    current_tasks = payload.get("tasks", [])
+                    if not current_tasks:
+                        finished = True
+                        break
+
+                    tasks.extend(current_tasks)
+
+                    # Если задан лимит задач, не загружаем лишние страницы
+                    if self.config.max_tasks is not None and len(tasks) >= self.config.max_tasks:
+                        tasks = tasks[: self.config.max_tasks]
+                        finished = True
+                        break
+                    if payload.get("last_page"):
+                        finished = True
+                        break
+                page += pages_per_batch
 
         return tasks
 
+    def _fetch_tasks_page(self, url: str, params: Dict[str, Any], page: int) -> Dict[str, Any]:
+        response = self.session.get(
+            url,
+            params={**params, "page": page},
+            headers=self.clickup_headers,
+            timeout=30,
+        )
+        response.raise_for_status()
+        return loads_json(response.content)
+
     def _prefetch_task_details(self, tasks: List[Dict[str, Any]]) -> None:
         if not tasks:
             return
 
+        task_ids: List[str] = []
+        versions: Dict[str, Any] = {}
         for task in tasks:
             task_id_raw = task.get("id")
             task_id = str(task_id_raw).strip() if task_id_raw else ""
-            if not task_id:
-                continue
+            if task_id and task_id not in task_ids:
+                task_ids.append(task_id)
+                versions[task_id] = task.get("date_updated")
+        self._fetch_task_details_batch(task_ids, versions)
 
-            details = self._get_task_details(task_id)
+        # Родителей узнаём из уже загруженных карточек, поэтому грузим их второй волной.
+        parent_ids: List[str] = []
+        for task in tasks:
+            task_id = self._task_id(task)
+            details = self._task_cache.get(task_id) if task_id else None
             if not details:
                 continue
-
             parent_id_raw = details.get("parent") or task.get("parent")
             parent_id = str(parent_id_raw).strip() if parent_id_raw else ""
-            if parent_id:
-                self._get_task_details(parent_id)
+            if parent_id and parent_id not in parent_ids:
+                parent_ids.append(parent_id)
+        self._fetch_task_details_batch(parent_ids)
+
+    def _fetch_task_details_batch(
+        self,
+        task_ids: List[str],
+        versions: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        missing = [task_id for task_id in task_ids if task_id not in self._task_cache]
+        if not missing:
+            return
+        versions = versions or {}
+        if len(missing) == 1:
+            self._get_task_details(missing[0], versions.get(missing[0]))
+            return
+        workers = min(CLICKUP_PARALLEL_REQUESTS, len(missing))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="clickup-prefetch") as executor:
+            list(executor.map(lambda task_id: self._get_task_details(task_id, versions.get(task_id)), missing))
 
     def _sort_tasks(self, tasks: List[Dict[str, Any]]) -> None:
-        if not tasks:
+        if len(tasks) < 2:
             return
+        tasks.sort(key=self._task_sort_key)
 
-        def sort_key(task: Dict[str, Any]) -> tuple[int, int, str]:
-            task_id = str(task.get("id") or "").strip()
-            due_raw = task.get("due_date") or task.get("due_date_time")
-            due_value = self._parse_clickup_timestamp(due_raw)
+    @classmethod
+    def _task_sort_key(cls, task: Dict[str, Any]) -> Tuple[int, int, str]:
+        # Задачи без дедлайна или даты закрытия уходят в конец списка
+        due_value = cls._parse_clickup_timestamp(task.get("due_date") or task.get("due_date_time"))
+        closed_value = cls._parse_clickup_timestamp(task.get("date_closed"))
+        return (
+            SORT_KEY_MISSING if due_value is None else due_value,
+            SORT_KEY_MISSING if closed_value is None else closed_value,
+            cls._task_id(task),
+        )
 
-            closed_raw = task.get("date_closed") or task.get("date_closed")
-            closed_value = self._parse_clickup_timestamp(closed_raw)
+    @classmethod
+    def _prepare_task(cls, task: Dict[str, Any]) -> None:
+        # Идентификатор, статус и дата завершения нормализуются один раз на задачу
+        # и хранятся в самой карточке рядом с исходными полями.
+        cls._task_id(task)
+        cls._task_status(task)
+        cls._task_done_ms(task)
 
-            due_key = due_value if due_value is not None else 2**63 - 1
-            closed_key = closed_value if closed_value is not None else 2**63 - 1
-            return (due_key, closed_key, task_id)
+    @staticmethod
+    def _task_id(task: Dict[str, Any]) -> str:
+        task_id = task.get("_norm_id")
+        if task_id is None:
+            task_id = str(task.get("id") or "").strip()
+            task["_norm_id"] = task_id
+        return task_id
 
-        tasks.sort(key=sort_key)
+    @staticmethod
+    def _task_status(task: Dict[str, Any]) -> str:
+        status = task.get("_status_lower")
+        if status is None:
+            status_data = task.get("status")
+            status_field = status_data.get("status") if isinstance(status_data, dict) else None
+            status = str(status_field or "").strip().lower()
+            task["_status_lower"] = status
+        return status
+
+    @classmethod
+    def _task_done_ms(cls, task: Dict[str, Any]) -> Optional[int]:
+        if "_done_ms" not in task:
+            task["_done_ms"] = cls._parse_clickup_timestamp(
+                task.get("date_done") or task.get("date_closed")
+            )
+        return task["_done_ms"]
 
     def _tasks_endpoint(self) -> str:
         if self.config.list_id:
@@ -263,29 +762,88 @@ class ClickUpAgent:
             return f"{CLICKUP_API_BASE}/space/{self.config.space_id}/task"
         raise ConfigError("Не заданы CLICKUP_LIST_ID или CLICKUP_SPACE_ID")
 
-    def _get_task_details(self, task_id: str) -> Optional[Dict[str, Any]]:
+    def _get_task_details(
+        self,
+        task_id: str,
+        date_updated: Optional[Any] = None,
+    ) -> Optional[Dict[str, Any]]:
         if not task_id:
             return None
         if task_id in self._task_cache:
             return self._task_cache[task_id]
+        # Одну карточку (обычно общего родителя) могут одновременно запросить
+        # несколько потоков: в ClickUp идёт один запрос, остальные ждут его результат.
+        with self._task_fetch_lock:
+            if task_id in self._task_cache:
+                return self._task_cache[task_id]
+            pending = self._task_fetches.get(task_id)
+            is_owner = pending is None
+            if pending is None:
+                pending = Future()
+                self._task_fetches[task_id] = pending
+        if not is_owner:
+            return pending.result()
+        try:
+            data = self._load_task_details(task_id, date_updated)
+        except BaseException as exc:
+            pending.set_exception(exc)
+            raise
+        else:
+            pending.set_result(data)
+            return data
+        finally:
+            with self._task_fetch_lock:
+                self._task_fetches.pop(task_id, None)
+
+    def _load_task_details(
+        self,
+        task_id: str,
+        date_updated: Optional[Any] = None,
+    ) -> Optional[Dict[str, Any]]:
+        # date_updated из списка задач позволяет переиспользовать карточку с прошлого запуска
+        version = str(date_updated).strip() if date_updated not in (None, "") else ""
+        if version and self.cache is not None:
+            cached = self._cache_get("task", task_id, version=version)
+            if cached is not None:
+                self._task_cache[task_id] = cached
+                return cached
         url = f"{CLICKUP_API_BASE}/task/{task_id}"
         try:
-            response = self.session.get(url, timeout=30)
+            response = self.session.get(url, headers=self.clickup_headers, timeout=30)
             response.raise_for_status()
         except requests.RequestException as exc:
             logging.warning("Не удалось получить данные задачи %s: %s", task_id, exc)
             self._task_cache[task_id] = None
             return None
-        data = response.json()
+        data = loads_json(response.content)
         self._task_cache[task_id] = data
+        fetched_version = str(data.get("date_updated") or version).strip()
+        if fetched_version:
+            self._cache_set("task", task_id, data, version=fetched_version)
         return data
 
+    def _cache_get(self, namespace: str, key: str, **kwargs: Any) -> Optional[Any]:
+        if self.cache is None:
+            return None
+        try:
+            return self.cache.get(namespace, key, **kwargs)
+        except (sqlite3.Error, ValueError) as exc:
+            logging.warning("Ошибка чтения кэша (%s): %s", namespace, exc)
+            return None
+
+    def _cache_set(self, namespace: str, key: str, value: Any, **kwargs: Any) -> None:
+        if self.cache is None:
+            return
+        try:
+            self.cache.set(namespace, key, value, **kwargs)
+        except (sqlite3.Error, TypeError, ValueError) as exc:
+            logging.warning("Ошибка записи в кэш (%s): %s", namespace, exc)
+
     def _is_status_closed(self, task: Dict[str, Any]) -> bool:
         closed_status = (self.config.closed_status or "").strip().lower()
         if not closed_status:
             return False
-        status_field = (task.get("status") or {}).get("status", "")
-        current_status = str(status_field or "").strip().lower()
+        current_status = self._task_status(task)
         return bool(current_status) and current_status == closed_status
 
     def _task_already_scored(self, task: Dict[str, Any]) -> bool:
@@ -296,30 +854,41 @@ class ClickUpAgent:
             and self._custom_field_has_value(task, self.config.quality_field_id)
         )
 
-    @staticmethod
-    def _custom_field_has_value(task: Dict[str, Any], field_id: str) -> bool:
+    @classmethod
+    def _custom_field_has_value(cls, task: Dict[str, Any], field_id: str) -> bool:
         if not field_id:
             return False
-        custom_fields = task.get("custom_fields")
-        if not isinstance(custom_fields, list):
-            return False
         target_id = str(field_id).strip()
         if not target_id:
             return False
-        for field in custom_fields:
-            candidate_id = str(field.get("id") or "").strip()
-            if candidate_id != target_id:
-                continue
-            value = field.get("value")
-            if value is None:
-                continue
-            if isinstance(value, str) and not value.strip():
-                continue
-            return True
-        return False
+        return target_id in cls._filled_custom_fields(task)
 
-    def _should_process_task(self, task: Dict[str, Any]) -> bool:
-        status = (task.get("status") or {}).get("status", "").lower()
+    @staticmethod
+    def _filled_custom_fields(task: Dict[str, Any]) -> Dict[str, Any]:
+        # Индекс заполненных кастомных полей строится один раз на карточку
+        # и хранится прямо в ней, чтобы проверки полей были O(1).
+        index = task.get("_fields_by_id")
+        if isinstance(index, dict):
+            return index
+        index = {}
+        custom_fields = task.get("custom_fields")
+        if isinstance(custom_fields, list):
+            for field in custom_fields:
+                candidate_id = str(field.get("id") or "").strip()
+                value = field.get("value")
+                if not candidate_id or value is None:
+                    continue
+                if isinstance(value, str) and not value.strip():
+                    continue
+                index[candidate_id] = value
+        task["_fields_by_id"] = index
+        return index
+
+    def _should_process_task(
+        self,
+        task: Dict[str, Any],
+    ) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        status = self._task_status(task)
         targets = self.config.normalized_target_statuses
         if targets and status not in targets:
             logging.debug(
@@ -328,24 +897,158 @@ class ClickUpAgent:
                 status,
                 targets,
             )
-            return False
+            return False, None
 
-        task_id = str(task.get("id") or "").strip()
-        details = self._get_task_details(task_id) if task_id else None
-        source = details or task
+        task_id = self._task_id(task)
+        # Статус и кастомные поля уже есть в ответе списка: отсеиваем по ним задачи,
+        # не загружая карточку. Карточка нужна только для прошедших фильтр задач.
+        if self._is_excluded(task, task_id):
+            return False, None
+
+        details = self._get_task_details(task_id, task.get("date_updated")) if task_id else None
+        if details and self._is_excluded(details, task_id):
+            return False, details
+
+        return True, details
+
+    def _is_excluded(self, source: Dict[str, Any], task_id: str) -> bool:
         if self._is_status_closed(source):
             logging.debug("Пропуск задачи %s: статус закрыт (%s)", task_id, self.config.closed_status)
-            return False
+            return True
 
         if self._task_already_scored(source):
             logging.debug("Пропуск задачи %s: кастомные поля скорости/качества уже заполнены", task_id)
-            return False
+            return True
 
-        return True
+        return False
+
+    def _get_assessment(
+        self,
+        task: Dict[str, Any],
+        task_details: Optional[Dict[str, Any]] = None,
+    ) -> AssessmentResult:
+        task_id = self._task_id(task)
+        payload, time_metrics = self._build_assessment_payload(task, task_details)
+
+        cache_key = self._assessment_cache_key(payload)
+        cached = self._cached_assessment(cache_key, task_id)
+        if cached is not None:
+            return cached
+
+        response_payload = self._call_lm_completion(payload)
+        content = self._extract_json_payload(self._response_content(response_payload))
+        logging.debug("Ответ модели: %s", content)
 
-    def _get_assessment(self, task: Dict[str, Any]) -> AssessmentResult:
-        task_id = str(task.get("id") or "").strip()
-        task_details = self._get_task_details(task_id) if task_id else None
+        data = self._decode_json_object(content)
+        if data is None:
+            raise ValueError(f"Модель вернула невалидный JSON: {content}")
+
+        assessment = self._assessment_from_data(data, time_metrics)
+        self._cache_set("assessment", cache_key, asdict(assessment))
+        return assessment
+
+    def _get_assessments_batch(
+        self,
+        items: List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]],
+    ) -> List[Optional[AssessmentResult]]:
+        # Задачи без кэша оцениваются одним запросом; None в результате означает,
+        # что задачу нужно оценить отдельно (ошибка сборки промпта или ответа).
+        results: List[Optional[AssessmentResult]] = [None] * len(items)
+        pending: List[Tuple[int, str, Dict[str, Any], Dict[str, Optional[int]]]] = []
+        for index, (task, details) in enumerate(items):
+            task_id = self._task_id(task)
+            try:
+                payload, time_metrics = self._build_assessment_payload(task, details)
+            except Exception as exc:  # noqa: BLE001
+                logging.warning("Не удалось подготовить промпт задачи %s: %s", task_id, exc)
+                continue
+            cache_key = self._assessment_cache_key(payload)
+            cached = self._cached_assessment(cache_key, task_id)
+            if cached is not None:
+                results[index] = cached
+                continue
+            user_content = payload["messages"][-1]["content"]
+            pending.append((index, cache_key, user_content, time_metrics))
+        if len(pending) < 2:
+            return results
+
+        count = len(pending)
+        tasks_block = "\n\n".join(
+            f"=== ЗАДАЧА {number} из {count} ===\n{user_content}"
+            for number, (_, _, user_content, _) in enumerate(pending, start=1)
+        )
+        batch_payload = {
+            "model": self.config.lm_model,
+            "messages": [
+                LM_SYSTEM_MESSAGE,
+                {
+                    "role": "user",
+                    "content": LM_BATCH_PROMPT_TEMPLATE.format(count=count, tasks=tasks_block),
+                },
+            ],
+            "temperature": self.config.lm_temperature,
+            "max_tokens": 10000,
+        }
+        try:
+            response_payload = self._call_lm_completion(batch_payload, stop_at_json_end=False)
+        except requests.RequestException as exc:
+            logging.warning("Пакетный запрос к LM Studio не удался, оцениваем по одной: %s", exc)
+            return results
+        content = self._extract_json_payload(self._response_content(response_payload))
+        logging.debug("Ответ модели на пакет: %s", content)
+        entries = self._decode_json_array(content)
+        if entries is None:
+            logging.warning("Модель не вернула JSON-массив оценок, оцениваем задачи по одной")
+            return results
+        if len(entries) != count:
+            logging.warning(
+                "Модель вернула %s оценок вместо %s, оцениваем задачи по одной",
+                len(entries),
+                count,
+            )
+            return results
+
+        for (index, cache_key, _, time_metrics), data in zip(pending, entries):
+            if not isinstance(data, dict):
+                continue
+            try:
+                assessment = self._assessment_from_data(data, time_metrics)
+            except (KeyError, TypeError, ValueError) as exc:
+                logging.warning("Некорректная оценка в пакетном ответе: %s", exc)
+                continue
+            self._cache_set("assessment", cache_key, asdict(assessment))
+            results[index] = assessment
+        return results
+
+    def _cached_assessment(self, cache_key: str, task_id: str) -> Optional[AssessmentResult]:
+        cached = self._cache_get("assessment", cache_key, max_age=ASSESSMENT_CACHE_TTL_SECONDS)
+        if not isinstance(cached, dict):
+            return None
+        try:
+            assessment = AssessmentResult(**cached)
+        except TypeError:
+            logging.debug("Пропуск устаревшей записи кэша оценок для задачи %s", task_id)
+            return None
+        logging.info("Оценка задачи %s взята из кэша", task_id)
+        return assessment
+
+    @staticmethod
+    def _response_content(response_payload: Dict[str, Any]) -> Any:
+        return (
+            response_payload
+            .get("choices", [{}])[0]
+            .get("message", {})
+            .get("content", "")
+        )
+
+    def _build_assessment_payload(
+        self,
+        task: Dict[str, Any],
+        task_details: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, Optional[int]]]:
+        task_id = self._task_id(task)
+        if task_details is None and task_id:
+            task_details = self._get_task_details(task_id, task.get("date_updated"))
         task_summary, time_metrics = self._build_task_context(task, details=task_details)
         source = task_details or task
         assignee_id, assignee_name, assignee_role = self._extract_primary_assignee(source)
@@ -365,9 +1068,7 @@ class ClickUpAgent:
                 f"качество {quality_display}/5 ({quality_reason})"
             )
 
-        avg_speed_history = self._calculate_metric_average(history_records, "speed")
-        avg_quality_history = self._calculate_metric_average(history_records, "quality")
-        avg_score = self._calculate_average_score(history_records)
+        avg_speed_history, avg_quality_history, avg_score = self._history_averages(assignee_id)
         performer_category = self._get_performer_category(avg_score)
 
         history_section = ""
@@ -437,126 +1138,45 @@ class ClickUpAgent:
             "performer_category": performer_category,
         }
 
+        user_content = LM_USER_PROMPT_TEMPLATE.format(
+            title=source.get("name") or task.get("name"),
+            task_summary=task_summary,
+            task_type=task_type,
+            priority=priority_display,
+            planned=planned_display,
+            tracked=tracked_display,
+            time_coefficient=time_coefficient_display,
+            due=due_display,
+            deadline_status=deadline_status,
+            errors_count=errors_count,
+            rework_time=rework_time,
+            acceptance_status=acceptance_status,
+            comments_count=comments_count if comments_count is not None else "нет данных",
+            activity_count=activity_count if activity_count is not None else "нет данных",
+            assignee_name=assignee_name,
+            assignee_role=assignee_role,
+            performer_category=performer_category,
+            avg_score=avg_score_display,
+            avg_speed=avg_speed_history_display,
+            avg_quality=avg_quality_history_display,
+            history_section=history_section,
+        )
         payload = {
             "model": self.config.lm_model,
             "messages": [
-                {
-                    "role": "system",
-                    "content": (
-                        "Ты ИИ-эксперт по оценке эффективности выполнения задач. "
-                        "Твоя роль — объективно проанализировать задачу, внимательно изучив её контекст, "
-                        "и предоставить независимую оценку скорости и качества.\n\n"
-                        "МЕТОДОЛОГИЯ ОЦЕНКИ:\n\n"
-                        "1. ОЦЕНКА СКОРОСТИ (1-5):\n"
-                        "Рассчитай коэффициент K = Фактическое время / Плановое время\n"
-                        "• 5 баллов: K ≤ 0,70 (выполнено на 30%+ быстрее плана, без ущерба качеству)\n"
-                        "• 4 балла: K = 0,71-1,00 (в срок или с небольшим опережением)\n"
-                        "• 3 балла: K = 1,01-1,30 (небольшое превышение до 30%, не критично)\n"
-                        "• 2 балла: K = 1,31-1,60 (существенное превышение 31-60%, влияет на другие задачи)\n"
-                        "• 1 балл: K > 1,60 (критическое превышение >60%, срыв дедлайна)\n\n"
-                        "2. ОЦЕНКА КАЧЕСТВА (1-5):\n"
-                        "• 5 баллов: 0 ошибок, 0 доработок, принято сразу, превосходит ожидания\n"
-                        "• 4 балла: 1-2 незначительных замечания, исправлено быстро (<10% времени)\n"
-                        "• 3 балла: 3-5 ошибок, доработка 10-30% времени, один раунд исправлений\n"
-                        "• 2 балла: >5 ошибок или критичные, переработка 30-50% времени, несколько раундов\n"
-                        "• 1 балл: критические ошибки, требуется полная переделка (>50% времени)\n\n"
-                        "3. КОНТЕКСТНЫЙ АНАЛИЗ:\n"
-                        "• Сравни текущую оценку со средним историческим баллом исполнителя\n"
-                        "• Учитывай категорию исполнителя (эксперт/профессионал/развивающийся/проблемный)\n"
-                        "• Определи тренд: прогресс (+), стабильность (=), или регресс (-)\n"
-                        "• Для экспертов ожидания выше, для развивающихся — учитывай прогресс\n\n"
-                        "4. ИИ-ОЦЕНКА ОПТИМАЛЬНОГО ВРЕМЕНИ:\n"
-                        "• Проанализируй описание и тип задачи\n"
-                        "• Оцени, сколько времени ДОЛЖНА была занять эта конкретная задача для специалиста данного уровня на основе всех доступных деталей\n"
-                        "• Сравни с плановым временем: было ли оно реалистичным?\n"
-                        "• Сравни с фактическим временем: насколько эффективно работал исполнитель?\n\n"
-                        "ФОРМАТ ОТВЕТА:\n"
-                        "Верни строго JSON с ключами:\n"
-                        '• "speed_score": целое число 1-5\n'
-                        '• "quality_score": целое число 1-5\n'
-                        '• "speed_reason": краткое пояснение (до 50 слов) на русском\n'
-                        '• "quality_reason": краткое пояснение (до 50 слов) на русском\n'
-                        '• "optimal_time_minutes": твоя оценка оптимального времени для этой задачи\n'
-                        '• "time_estimate_realistic": true/false — было ли плановое время реалистичным\n'
-                        '• "context_adjustment": число от -1 до +1 — рекомендуемая корректировка на основе истории\n'
-                        '• "trend": "progress" / "stable" / "regression" — тренд относительно истории\n'
-                        '• "performer_level_match": true/false — соответствует ли результат уровню исполнителя\n\n'
-                        "Будь объективным, учитывай все факторы, предоставляй конструктивную обратную связь."
-                    ),
-                },
-                {
-                    "role": "user",
-                    "content": (
-                        "ЗАДАЧА НА ОЦЕНКУ:\n\n"
-                        f"Название: {source.get('name') or task.get('name')}\n"
-                        f"Описание: {task_summary}\n"
-                        f"Тип задачи: {task_type}\n"
-                        f"Приоритет: {priority_display}\n\n"
-                        "ВРЕМЕННЫЕ ПОКАЗАТЕЛИ:\n"
-                        f"Плановое время (estimate): {planned_display} минут\n"
-                        f"Фактическое время (tracked): {tracked_display} минут\n"
-                        f"Коэффициент K: {time_coefficient_display}\n"
-                        f"Дедлайн: {due_display}\n"
-                        f"Статус дедлайна: {deadline_status}\n\n"
-                        "ПОКАЗАТЕЛИ КАЧЕСТВА:\n"
-                        f"Количество ошибок: {errors_count}\n"
-                        f"Время на доработки: {rework_time} минут\n"
-                        f"Статус приемки: {acceptance_status}\n"
-                        f"Количество комментариев: {comments_count if comments_count is not None else 'нет данных'}\n"
-                        f"Количество изменений (activity): {activity_count if activity_count is not None else 'нет данных'}\n\n"
-                        "ИСПОЛНИТЕЛЬ:\n"
-                        f"Имя: {assignee_name}\n"
-                        f"Роль/Специализация: {assignee_role}\n"
-                        f"Категория: {performer_category}\n"
-                        f"Средний исторический балл: {avg_score_display}\n"
-                        f"Средний балл скорости (история): {avg_speed_history_display}\n"
-                        f"Средний балл качества (история): {avg_quality_history_display}\n"
-                        f"{history_section}\n\n"
-                        "ТВОЯ ЗАДАЧА:\n"
-                        "1. Оцени СКОРОСТЬ выполнения (1-5) на основе коэффициента K и контекста\n"
-                        "2. Оцени КАЧЕСТВО результата (1-5) на основе ошибок, доработок и приемки\n"
-                        "3. Определи ОПТИМАЛЬНОЕ ВРЕМЯ для этой задачи по твоему профессиональному мнению\n"
-                        "4. Оцени, было ли плановое время реалистичным\n"
-                        "5. Сравни с историей исполнителя и определи тренд (прогресс/стабильность/регресс)\n"
-                        "6. Предложи контекстную корректировку (-1 до +1) на основе истории и категории\n"
-                        "7. Оцени, соответствует ли результат уровню профессионализма исполнителя\n"
-                        "8. Если у задачи есть плановое или фактическое время, подчеркни, "
-                        "что расчёт оптимального времени выполнялся индивидуально для этой карточки\n\n"
-                        "Ответь строго в JSON формате:\n"
-                        '{\n'
-                        '  "speed_score": 4,\n'
-                        '  "quality_score": 5,\n'
-                        '  "speed_reason": "Задача выполнена точно в срок (K=0.95), что соответствует плану...",\n'
-                        '  "quality_reason": "Работа принята с первого раза без замечаний, 0 ошибок...",\n'
-                        '  "optimal_time_minutes": 180,\n'
-                        '  "time_estimate_realistic": true,\n'
-                        '  "context_adjustment": 0.3,\n'
-                        '  "trend": "progress",\n'
-                        '  "performer_level_match": true\n'
-                        '}'
-                    ),
-                },
+                LM_SYSTEM_MESSAGE,
+                {"role": "user", "content": user_content},
             ],
             "temperature": self.config.lm_temperature,
             "max_tokens": 10000,
         }
+        return payload, time_metrics
 
-        response_payload = self._call_lm_completion(payload)
-
-        raw_content = (
-            response_payload
-            .get("choices", [{}])[0]
-            .get("message", {})
-            .get("content", "")
-        )
-        content = self._extract_json_payload(raw_content)
-        logging.debug("Ответ модели: %s", content)
-
-        try:
-            data = json.loads(content)
-        except json.JSONDecodeError as exc:
-            raise ValueError(f"Модель вернула невалидный JSON: {content}") from exc
-
+    def _assessment_from_data(
+        self,
+        data: Dict[str, Any],
+        time_metrics: Dict[str, Optional[int]],
+    ) -> AssessmentResult:
         speed = int(data["speed_score"])
         quality = int(data["quality_score"])
         speed_reason = str(data["speed_reason"]).strip()
@@ -592,6 +1212,16 @@ class ClickUpAgent:
             performer_level_match=performer_level_match,
         )
 
+    @staticmethod
+    def _assessment_cache_key(payload: Dict[str, Any]) -> str:
+        key_source = {
+            "model": payload.get("model"),
+            "temperature": payload.get("temperature"),
+            "messages": payload.get("messages"),
+        }
+        serialized = json.dumps(key_source, sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(serialized.encode("utf-8"), digest_size=32).hexdigest()
+
     def _apply_assessment(self, task: Dict[str, Any], assessment: AssessmentResult) -> None:
         task_id = task["id"]
         logging.info(
@@ -605,51 +1235,91 @@ class ClickUpAgent:
             logging.info("DRY RUN: пропуск обновления ClickUp для %s", task_id)
             return
 
-        self._update_custom_fields(task_id, assessment)
-        self._post_comment(task, assessment)
-        self._append_history_entry(task, assessment)
-        self._close_if_needed(task)
-
-    def _update_custom_fields(self, task_id: str, assessment: AssessmentResult) -> None:
         # ClickUp надёжно обновляет кастомные поля через отдельный эндпоинт
-        # POST /task/{task_id}/field/{field_id}, поэтому обновляем каждое поле по одному.
+        # POST /task/{task_id}/field/{field_id}; поля обновляются параллельно.
+        # Комментарий и запись истории пишутся только после успешного
+        # обновления полей, иначе задача без оценки получит повторный
+        # комментарий при следующем запуске. Закрытие задачи — последним.
+        self._run_io_calls(self._custom_field_calls(task_id, assessment))
+        self._run_io_calls(
+            [
+                (self._post_comment, task, assessment),
+                (self._append_history_entry, task, assessment),
+            ]
+        )
+        self._close_if_needed(task)
 
-        def _update_field(field_id: str, value: int, label: str) -> None:
-            if not field_id:
-                return
-            url = f"{CLICKUP_API_BASE}/task/{task_id}/field/{field_id}"
-            payload = {"value": value}
-            logging.info(
-                "Обновление кастомного поля '%s' (%s) для задачи %s: payload=%s",
-                label,
-                field_id,
-                task_id,
-                payload,
+    def _custom_field_calls(
+        self, task_id: str, assessment: AssessmentResult
+    ) -> List[Tuple[Any, ...]]:
+        calls: List[Tuple[Any, ...]] = []
+        if self.config.speed_field_id:
+            calls.append(
+                (
+                    self._update_custom_field,
+                    task_id,
+                    self.config.speed_field_id,
+                    assessment.speed,
+                    "speed",
+                )
             )
-            response = self.session.post(url, json=payload, timeout=30)
-            logging.info(
-                "Ответ ClickUp по полю '%s' задачи %s: status=%s, body=%s",
+        if self.config.quality_field_id:
+            calls.append(
+                (
+                    self._update_custom_field,
+                    task_id,
+                    self.config.quality_field_id,
+                    assessment.quality,
+                    "quality",
+                )
+            )
+        return calls
+
+    def _update_custom_field(self, task_id: str, field_id: str, value: int, label: str) -> None:
+        url = f"{CLICKUP_API_BASE}/task/{task_id}/field/{field_id}"
+        payload = {"value": value}
+        logging.info(
+            "Обновление кастомного поля '%s' (%s) для задачи %s: payload=%s",
+            label,
+            field_id,
+            task_id,
+            payload,
+        )
+        response = self.session.post(url, data=dumps_json(payload), headers=self.clickup_headers, timeout=30)
+        logging.info(
+            "Ответ ClickUp по полю '%s' задачи %s: status=%s, body=%s",
+            label,
+            task_id,
+            response.status_code,
+            response.text,
+        )
+        try:
+            response.raise_for_status()
+        except requests.HTTPError as exc:
+            logging.error(
+                "Не удалось обновить кастомное поле '%s' для задачи %s: %s | Ответ: %s",
                 label,
                 task_id,
-                response.status_code,
+                exc,
                 response.text,
             )
-            try:
-                response.raise_for_status()
-            except requests.HTTPError as exc:
-                logging.error(
-                    "Не удалось обновить кастомное поле '%s' для задачи %s: %s | Ответ: %s",
-                    label,
-                    task_id,
-                    exc,
-                    response.text,
-                )
-                raise
+            raise
 
-        if self.config.speed_field_id:
-            _update_field(self.config.speed_field_id, assessment.speed, "speed")
-        if self.config.quality_field_id:
-            _update_field(self.config.quality_field_id, assessment.quality, "quality")
+    def _run_io_calls(self, calls: List[Tuple[Any, ...]]) -> None:
+        # Независимые запросы к ClickUp выполняются в общем пуле; ждём все,
+        # затем пробрасываем первую ошибку в порядке вызовов.
+        if not calls:
+            return
+        if len(calls) == 1:
+            func, *args = calls[0]
+            func(*args)
+            return
+        futures = [self._io_executor.submit(func, *args) for func, *args in calls]
+        wait(futures)
+        for future in futures:
+            exc = future.exception()
+            if exc is not None:
+                raise exc
 
     def _post_comment(self, task: Dict[str, Any], assessment: AssessmentResult) -> None:
         task_id = task.get("id")
@@ -674,33 +1344,39 @@ class ClickUpAgent:
             )
         if time_lines:
             body_parts.extend(time_lines)
+        body_parts.extend(self._assessment_detail_lines(assessment, "Соответствует уровню"))
+        body_parts.append(f"Ссылка на задачу: {task_url}")
+        body = "\n".join(body_parts)
+        payload = {"comment_text": body, "notify_all": False}
+        response = self.session.post(
+            comment_endpoint, data=dumps_json(payload), headers=self.clickup_headers, timeout=30
+        )
+        response.raise_for_status()
+
+    @classmethod
+    def _assessment_detail_lines(
+        cls, assessment: AssessmentResult, level_label: str
+    ) -> List[str]:
+        # Необязательные строки оценки, общие для комментария и истории
+        lines: List[str] = []
         if assessment.optimal_time_minutes is not None:
-            body_parts.append(
-                f"Оптимальное время (оценка ИИ): {self._format_minutes(assessment.optimal_time_minutes)}"
+            lines.append(
+                f"Оптимальное время (оценка ИИ): {cls._format_minutes(assessment.optimal_time_minutes)}"
             )
         if assessment.time_estimate_realistic is not None:
-            body_parts.append(
+            lines.append(
                 "Плановое время реалистично: "
                 f"{'да' if assessment.time_estimate_realistic else 'нет'}"
             )
         if assessment.context_adjustment is not None:
-            body_parts.append(
-                f"Контекстная корректировка: {assessment.context_adjustment:+.2f}"
-            )
+            lines.append(f"Контекстная корректировка: {assessment.context_adjustment:+.2f}")
         if assessment.trend:
-            body_parts.append(
-                f"Тренд исполнителя: {self._translate_trend(assessment.trend)}"
-            )
+            lines.append(f"Тренд исполнителя: {cls._translate_trend(assessment.trend)}")
         if assessment.performer_level_match is not None:
-            body_parts.append(
-                "Соответствует уровню: "
-                f"{'да' if assessment.performer_level_match else 'нет'}"
+            lines.append(
+                f"{level_label}: {'да' if assessment.performer_level_match else 'нет'}"
             )
-        body_parts.append(f"Ссылка на задачу: {task_url}")
-        body = "\n".join(body_parts)
-        payload = {"comment_text": body, "notify_all": False}
-        response = self.session.post(comment_endpoint, json=payload, timeout=30)
-        response.raise_for_status()
+        return lines
 
     def _history_records_for_prompt(
         self,
@@ -708,40 +1384,131 @@ class ClickUpAgent:
     ) -> List[Dict[str, Any]]:
         if self.history_limit <= 0:
             return []
-        if not self.history_path.exists():
-            return []
-        try:
-            lines = self.history_path.read_text(encoding="utf-8").splitlines()
-        except OSError as exc:
-            logging.warning("Не удалось прочитать файл истории оценок: %s", exc)
-            return []
-        records: List[Dict[str, Any]] = []
-        for line in lines:
-            stripped = line.strip()
-            if not (stripped.startswith("<!--") and stripped.endswith("-->")):
-                continue
-            payload = stripped[4:-3].strip()
-            if not payload:
-                continue
-            try:
-                data = json.loads(payload)
-            except json.JSONDecodeError:
-                logging.warning("Пропуск поврежденной записи истории: %s", payload)
-                continue
-            records.append(data)
-        filtered = records
         normalized_assignee_id = (
             str(assignee_id).strip() if assignee_id not in (None, "") else ""
         )
-        if normalized_assignee_id:
-            filtered = [
-                record
-                for record in records
-                if str(record.get("assignee_id") or "").strip() == normalized_assignee_id
-            ]
-        if not filtered:
+        with self._history_lock:
+            self._ensure_history_loaded()
+            if normalized_assignee_id:
+                records = self._history_by_assignee.get(normalized_assignee_id, ())
+            else:
+                records = self._history_records or ()
+            return list(records)
+
+    def _history_averages(
+        self,
+        assignee_id: Optional[str] = None,
+    ) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+        """Средние баллы скорости, качества и общий балл по истории исполнителя."""
+
+        key = str(assignee_id).strip() if assignee_id not in (None, "") else ""
+        with self._history_lock:
+            averages = self._history_averages_cache.get(key)
+            if averages is None:
+                averages = self._calculate_history_averages(
+                    self._history_records_for_prompt(assignee_id)
+                )
+                self._history_averages_cache[key] = averages
+            return averages
+
+    def _ensure_history_loaded(self) -> None:
+        # Файл истории разбирается заново, только если его изменил кто-то другой
+        # (mtime или размер разошлись); свои записи добавляются в индекс сразу.
+        # Сам stat() делается не чаще раза в HISTORY_STAT_INTERVAL_SECONDS.
+        checked_at = time.monotonic()
+        if (
+            self._history_records is not None
+            and checked_at - self._history_checked_at < HISTORY_STAT_INTERVAL_SECONDS
+        ):
+            return
+        self._history_checked_at = checked_at
+        current_stat = self._history_file_stat()
+        if self._history_records is not None and current_stat == self._history_stat:
+            return
+        self._history_stat = current_stat
+        self._history_records = deque(self._read_history_records(), maxlen=self._history_maxlen())
+        self._rebuild_history_index()
+
+    def _history_maxlen(self) -> Optional[int]:
+        # В памяти держим столько же записей, сколько попадает в промпт
+        return self.history_limit if self.history_limit > 0 else None
+
+    def _history_file_stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.history_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _rebuild_history_index(self) -> None:
+        self._history_by_assignee = {}
+        self._history_averages_cache.clear()
+        for record in self._history_records or []:
+            self._index_history_record(record)
+
+    def _index_history_record(self, record: Dict[str, Any]) -> None:
+        record_assignee_id = self._history_assignee_key(record)
+        bucket = self._history_by_assignee.get(record_assignee_id)
+        if bucket is None:
+            bucket = deque(maxlen=self._history_maxlen())
+            self._history_by_assignee[record_assignee_id] = bucket
+        bucket.append(record)
+
+    @staticmethod
+    def _history_assignee_key(record: Dict[str, Any]) -> str:
+        return str(record.get("assignee_id") or "").strip()
+
+    def _remember_history_record(self, record: Dict[str, Any]) -> None:
+        records = self._history_records
+        if records is None:
+            return
+        # Самая старая запись вытесняется из общего окна, а значит и из индекса
+        # её исполнителя, где она тоже самая старая: пересборка индекса не нужна.
+        if records.maxlen is not None and len(records) == records.maxlen:
+            evicted = records[0]
+            evicted_key = self._history_assignee_key(evicted)
+            bucket = self._history_by_assignee.get(evicted_key)
+            if bucket and bucket[0] is evicted:
+                bucket.popleft()
+                if not bucket:
+                    del self._history_by_assignee[evicted_key]
+            self._history_averages_cache.pop(evicted_key, None)
+        records.append(record)
+        self._index_history_record(record)
+        self._history_averages_cache.pop("", None)
+        self._history_averages_cache.pop(self._history_assignee_key(record), None)
+
+    def _read_history_records(self) -> List[Dict[str, Any]]:
+        # В памяти нужны только последние history_limit записей
+        records: Deque[Dict[str, Any]] = deque(
+            maxlen=self.history_limit if self.history_limit > 0 else None
+        )
+        # Файл отображается в память, а строки с JSON-комментарием ищет регулярное
+        # выражение: остальной markdown не копируется и не декодируется.
+        try:
+            with self.history_path.open("rb") as handle:
+                if os.fstat(handle.fileno()).st_size == 0:
+                    return []
+                with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    for match in HISTORY_RECORD_RE.finditer(buffer):
+                        payload = match.group(1).strip()
+                        if not payload:
+                            continue
+                        try:
+                            data = loads_json(payload)
+                        except ValueError:
+                            logging.warning(
+                                "Пропуск поврежденной записи истории: %s",
+                                payload.decode("utf-8", errors="replace"),
+                            )
+                            continue
+                        records.append(data)
+        except FileNotFoundError:
             return []
-        return filtered[-self.history_limit :]
+        except (OSError, ValueError) as exc:
+            logging.warning("Не удалось прочитать файл истории оценок: %s", exc)
+            return []
+        return list(records)
 
     def _append_history_entry(self, task: Dict[str, Any], assessment: AssessmentResult) -> None:
         if self.dry_run:
@@ -775,7 +1542,7 @@ class ClickUpAgent:
             "timestamp": timestamp,
         }
         entry_lines = [
-            f"<!-- {json.dumps(record, ensure_ascii=False)} -->",
+            f"<!-- {dumps_json(record).decode('utf-8')} -->",
             f"## [{task_name}]({task_url})",
             f"- Task ID: {task_id}",
             f"- Исполнитель: {assignee_name}",
@@ -784,47 +1551,73 @@ class ClickUpAgent:
             f"- Плановое время: {self._format_minutes(assessment.planned_time_minutes)}",
             f"- Трекер времени: {self._format_minutes(assessment.tracked_time_minutes)}",
         ]
-        if assessment.optimal_time_minutes is not None:
-            entry_lines.append(
-                f"- Оптимальное время (оценка ИИ): {self._format_minutes(assessment.optimal_time_minutes)}"
-            )
-        if assessment.time_estimate_realistic is not None:
-            entry_lines.append(
-                "- Плановое время реалистично: "
-                f"{'да' if assessment.time_estimate_realistic else 'нет'}"
-            )
-        if assessment.context_adjustment is not None:
-            entry_lines.append(
-                f"- Контекстная корректировка: {assessment.context_adjustment:+.2f}"
-            )
-        if assessment.trend:
-            entry_lines.append(
-                f"- Тренд исполнителя: {self._translate_trend(assessment.trend)}"
-            )
-        if assessment.performer_level_match is not None:
-            entry_lines.append(
-                "- Соответствие уровню: "
-                f"{'да' if assessment.performer_level_match else 'нет'}"
-            )
+        entry_lines.extend(
+            f"- {line}"
+            for line in self._assessment_detail_lines(assessment, "Соответствие уровню")
+        )
         entry_lines.append(f"_Оценено: {timestamp}_")
         entry_lines.append("---")
-        entry = "\n".join(entry_lines)
-        try:
+        # Строки записи и разделители уходят в файл одним writev без склейки в общий буфер
+        parts: List[bytes] = []
+        for line in entry_lines:
+            parts.append(b"\n")
+            parts.append(line.encode("utf-8"))
+        with self._history_lock:
+            try:
+                handle = self._history_append_handle()
+                start = 0 if handle.tell() > 0 else 1
+                self._write_all(handle, parts[start:])
+            except OSError as exc:
+                logging.warning("Не удалось записать историю оценок: %s", exc)
+                self._close_history_handle()
+            else:
+                self._remember_history_record(record)
+                if self._history_records is not None:
+                    stat = os.fstat(handle.fileno())
+                    self._history_stat = (stat.st_mtime_ns, stat.st_size)
+                self._history_prune_pending = True
+                self._history_appends_since_prune += 1
+                if self._history_appends_since_prune >= max(1, self._history_compact_threshold):
+                    self._prune_history_file()
+
+    def _history_append_handle(self) -> BinaryIO:
+        # Один дескриптор на весь запуск вместо open/close на каждую запись
+        if self._history_handle is None:
             self.history_path.parent.mkdir(parents=True, exist_ok=True)
-            needs_leading_newline = self.history_path.exists() and self.history_path.stat().st_size > 0
-            with self.history_path.open("a", encoding="utf-8") as handle:
-                if needs_leading_newline:
-                    handle.write("\n")
-                handle.write(entry)
-        except OSError as exc:
-            logging.warning("Не удалось записать историю оценок: %s", exc)
-        else:
-            self._prune_history_file()
+            # Без буфера Python: данные сразу попадают в файл, индекс сверяет mtime/размер
+            self._history_handle = self.history_path.open("ab", buffering=0)
+        return self._history_handle
+
+    @staticmethod
+    def _write_all(handle: BinaryIO, parts: List[bytes]) -> None:
+        total = sum(len(part) for part in parts)
+        written = 0
+        if hasattr(os, "writev") and len(parts) > 4:
+            written = os.writev(handle.fileno(), parts)
+            if written == total:
+                return
+        # Запасной путь (и дозапись после частичного writev): обычная запись по кускам
+        remaining = memoryview(b"".join(parts))[written:]
+        while remaining:
+            count = handle.write(remaining)
+            if not count:
+                raise OSError("Запись в файл истории не продвинулась")
+            remaining = remaining[count:]
+
+    def _close_history_handle(self) -> None:
+        with self._history_lock:
+            if self._history_handle is None:
+                return
+            try:
+                self._history_handle.close()
+            except OSError as exc:
+                logging.warning("Не удалось закрыть файл истории оценок: %s", exc)
+            self._history_handle = None
 
     def _close_if_needed(self, task: Dict[str, Any]) -> None:
         if not self._should_close(task):
             return
-        task_id = str(task.get("id") or "").strip()
+        task_id = self._task_id(task)
         if not task_id:
             logging.warning("Пропуск закрытия задачи: отсутствует идентификатор.")
             return
@@ -848,20 +1641,40 @@ class ClickUpAgent:
         else:
             logging.info("Задача %s переведена в статус '%s'", task_id, closed_status)
 
-    def _call_lm_completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    def _call_lm_completion(
+        self, payload: Dict[str, Any], stop_at_json_end: bool = True
+    ) -> Dict[str, Any]:
         url = f"{self.config.lm_base_url.rstrip('/')}/v1/chat/completions"
         logging.debug("Отправка запроса в LM Studio: %s", url)
         max_attempts = 3
-        for attempt in range(1, max_attempts + 1):
+        attempt = 0
+        while attempt < max_attempts:
+            attempt += 1
+            stream = self._lm_streaming
+            request_payload = {**payload, "stream": True} if stream else payload
             try:
-                response = self.lm_session.post(url, json=payload, timeout=60)
-                response.raise_for_status()
-                return response.json()
-            except requests.RequestException as exc:
+                with self._lm_slots, self.session.post(
+                    url, data=dumps_json(request_payload), timeout=60, stream=stream
+                ) as response:
+                    if stream and response.status_code == 400:
+                        logging.warning(
+                            "LM Studio отклонила потоковый режим, переключаемся на обычные запросы."
+                        )
+                        self._lm_streaming = False
+                        attempt -= 1
+                        continue
+                    response.raise_for_status()
+                    content_type = response.headers.get("Content-Type", "")
+                    if stream and content_type.startswith("text/event-stream"):
+                        return self._read_lm_stream(response, stop_at_json_end)
+                    return loads_json(response.content)
+            except (requests.RequestException, ValueError) as exc:
                 if attempt >= max_attempts:
                     logging.error("LM Studio не ответила после %s попыток", attempt)
                     raise
-                wait_seconds = min(2**attempt, 10)
+                wait_seconds = self._retry_after_seconds(exc)
+                if wait_seconds is None:
+                    wait_seconds = min(2**attempt, 10)
                 logging.warning(
                     "Ошибка LM Studio (попытка %s/%s): %s. Повтор через %s с.",
                     attempt,
@@ -872,6 +1685,47 @@ class ClickUpAgent:
                 time.sleep(wait_seconds)
         return {}
 
+    @staticmethod
+    def _retry_after_seconds(exc: Exception) -> Optional[float]:
+        response = getattr(exc, "response", None)
+        if response is None:
+            return None
+        retry_after = response.headers.get("Retry-After")
+        try:
+            return min(max(float(retry_after), 0.0), 60.0) if retry_after else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _read_lm_stream(
+        response: requests.Response, stop_at_json_end: bool = True
+    ) -> Dict[str, Any]:
+        # Собираем ответ из SSE-чанков и обрываем генерацию, как только JSON-объект закрыт:
+        # всё, что модель пишет после закрывающей скобки, нам не нужно.
+        parts: List[str] = []
+        tracker = _JsonObjectTracker()
+        for line in response.iter_lines():
+            if not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                break
+            try:
+                chunk = loads_json(data)
+            except ValueError:
+                logging.debug("Пропуск некорректного чанка LM Studio: %s", data)
+                continue
+            choices = chunk.get("choices") or [{}]
+            piece = (choices[0].get("delta") or {}).get("content") or ""
+            if not piece:
+                continue
+            end = tracker.feed(piece) if stop_at_json_end else None
+            if end is not None:
+                parts.append(piece[:end])
+                break
+            parts.append(piece)
+        return {"choices": [{"message": {"content": "".join(parts)}}]}
+
     @staticmethod
     def _build_retry_session(headers: Optional[Dict[str, str]] = None) -> requests.Session:
         session = requests.Session()
@@ -883,18 +1737,26 @@ class ClickUpAgent:
             status_forcelist=(429, 500, 502, 503, 504),
             allowed_methods={"GET", "POST", "PUT"},
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        adapter = ClickUpAgent._build_http_adapter(retry_strategy)
         session.mount("https://", adapter)
         session.mount("http://", adapter)
         if headers:
             session.headers.update(headers)
         return session
 
+    @staticmethod
+    def _build_http_adapter(max_retries: Any) -> HTTPAdapter:
+        return HTTPAdapter(
+            pool_connections=HTTP_POOL_HOSTS,
+            pool_maxsize=HTTP_POOL_SIZE,
+            max_retries=max_retries,
+        )
+
     def _should_close(self, task: Dict[str, Any]) -> bool:
         if not self.config.closed_status:
             return False
 
-        current_status = (task.get("status") or {}).get("status", "").lower()
+        current_status = self._task_status(task)
         triggers = self.config.normalized_auto_close_statuses
         if not triggers:
             return False
@@ -902,23 +1764,16 @@ class ClickUpAgent:
             return False
 
         # Дополнительное условие: автозакрывать только задачи, которые завершены более недели назад.
-        done_raw = task.get("date_done") or task.get("date_closed")
-        if not done_raw:
+        done_ms = self._task_done_ms(task)
+        if done_ms is None:
             return False
 
-        try:
-            done_ms = int(done_raw)
-        except (TypeError, ValueError):
-            return False
-
-        done_dt = datetime.fromtimestamp(done_ms / 1000, tz=timezone.utc)
-        now = datetime.now(timezone.utc)
-        age_days = (now - done_dt).days
+        age_days = (self._now_ms() - done_ms) // MS_PER_DAY
         if age_days <= 7:
             logging.info(
                 "Пропуск автозакрытия задачи %s: дата завершения %s, прошло %s дн. (<= 7)",
                 task.get("id"),
-                done_dt.isoformat(),
+                self._format_ms_iso(done_ms),
                 age_days,
             )
             return False
@@ -928,7 +1783,7 @@ class ClickUpAgent:
     def _close_task(self, task_id: str) -> None:
         url = f"{CLICKUP_API_BASE}/task/{task_id}"
         payload = {"status": self.config.closed_status}
-        response = self.session.put(url, json=payload, timeout=30)
+        response = self.session.put(url, data=dumps_json(payload), headers=self.clickup_headers, timeout=30)
         response.raise_for_status()
 
     def _build_task_context(
@@ -936,15 +1791,26 @@ class ClickUpAgent:
         task: Dict[str, Any],
         details: Optional[Dict[str, Any]] = None,
     ) -> tuple[str, Dict[str, Optional[int]]]:
-        task_id = str(task.get("id") or "").strip()
+        task_id = self._task_id(task)
         resolved_details = (
-            details if details is not None else (self._get_task_details(task_id) if task_id else None)
+            details
+            if details is not None
+            else (self._get_task_details(task_id, task.get("date_updated")) if task_id else None)
         )
+        # Контекст одной и той же версии карточки собирается один раз за запуск
+        # (повторная оценка после пакетного запроса, повторные попытки).
+        version = (resolved_details or task).get("date_updated")
+        context_key = (task_id, str(version or ""), resolved_details is not None)
+        if task_id:
+            cached = self._context_cache.get(context_key)
+            if cached is not None:
+                return cached
         description = (
             (resolved_details or {}).get("description")
             or task.get("description")
             or ""
         ).strip()
+        description = self._truncate_chars(description, MAX_DESCRIPTION_CHARS)
         sections: List[str] = []
         if description:
             sections.append(f"Описание задачи: {description}")
@@ -965,7 +1831,10 @@ class ClickUpAgent:
         if parent_section:
             sections.append(parent_section)
 
-        return "\n\n".join(sections), time_metrics
+        context = ("\n\n".join(sections), time_metrics)
+        if task_id:
+            self._context_cache[context_key] = context
+        return context
 
     def _parent_task_context(self, task: Dict[str, Any], details: Optional[Dict[str, Any]]) -> str:
         parent_id_raw = (details or {}).get("parent") or task.get("parent")
@@ -982,7 +1851,9 @@ class ClickUpAgent:
         parent_status = ""
         if isinstance(status_data, dict):
             parent_status = (status_data.get("status") or "").strip()
-        parent_description = (parent.get("description") or "").strip()
+        parent_description = self._truncate_chars(
+            (parent.get("description") or "").strip(), MAX_DESCRIPTION_CHARS
+        )
         parent_url = parent.get("url") or f"https://app.clickup.com/t/{parent_id}"
 
         lines = [f"Родительская задача: {parent_name} (ID {parent_id})"]
@@ -997,8 +1868,14 @@ class ClickUpAgent:
 
         return "\n".join(lines)
 
-    @staticmethod
-    def _extract_primary_assignee(task_data: Dict[str, Any]) -> Tuple[Optional[str], str, str]:
+    @classmethod
+    def _extract_primary_assignee(
+        cls, task_data: Dict[str, Any]
+    ) -> Tuple[Optional[str], str, str]:
+        # Результат запоминается в самой карточке: исполнитель нужен и для промпта, и для истории
+        cached = task_data.get("_primary_assignee")
+        if isinstance(cached, tuple):
+            return cached
         assignee_id: Optional[str] = None
         assignee_name = "не указан"
         assignee_role = "не указана"
@@ -1006,31 +1883,26 @@ class ClickUpAgent:
         if isinstance(assignees, list) and assignees:
             first_assignee = assignees[0]
             if isinstance(first_assignee, dict):
-                raw_id = first_assignee.get("id")
-                if raw_id not in (None, ""):
-                    normalized_id = str(raw_id).strip()
-                    assignee_id = normalized_id or None
-                name_candidate = (
-                    first_assignee.get("username")
-                    or first_assignee.get("email")
-                    or first_assignee.get("user")
-                    or first_assignee.get("id")
-                )
-                if name_candidate not in (None, ""):
-                    normalized_name = str(name_candidate).strip()
-                    if normalized_name:
-                        assignee_name = normalized_name
-                role_candidate = first_assignee.get("role")
-                if role_candidate not in (None, ""):
-                    normalized_role = str(role_candidate).strip()
-                    if normalized_role:
-                        assignee_role = normalized_role
+                assignee_id = cls._first_str(first_assignee, ("id",))
+                assignee_name = cls._first_str(first_assignee, ASSIGNEE_NAME_KEYS) or assignee_name
+                assignee_role = cls._first_str(first_assignee, ("role",)) or assignee_role
             elif isinstance(first_assignee, str):
                 normalized = first_assignee.strip()
                 if normalized:
                     assignee_id = normalized
                     assignee_name = normalized
-        return assignee_id, assignee_name, assignee_role
+        result = (assignee_id, assignee_name, assignee_role)
+        task_data["_primary_assignee"] = result
+        return result
+
+    @staticmethod
+    def _first_str(data: Dict[str, Any], keys: Tuple[str, ...]) -> Optional[str]:
+        # Первое непустое значение по списку ключей, приведённое к строке
+        for key in keys:
+            value = data.get(key)
+            if value not in (None, ""):
+                return str(value).strip() or None
+        return None
 
     @staticmethod
     def _format_minutes(raw_minutes: Optional[int]) -> str:
@@ -1056,6 +1928,12 @@ class ClickUpAgent:
 
     @staticmethod
     def _parse_clickup_timestamp(value: Optional[Any]) -> Optional[int]:
+        # Быстрый путь: ClickUp почти всегда присылает миллисекунды строкой из цифр
+        value_type = type(value)
+        if value_type is str and value.isascii() and value.isdigit():
+            return int(value) if value != "0" else None
+        if value_type is int:
+            return value or None
         if value in (None, "", 0, "0"):
             return None
         try:
@@ -1069,8 +1947,19 @@ class ClickUpAgent:
         timestamp = ClickUpAgent._parse_clickup_timestamp(value)
         if timestamp is None:
             return "не указан"
-        dt = datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
-        return dt.isoformat()
+        return ClickUpAgent._format_ms_iso(timestamp)
+
+    @staticmethod
+    def _format_ms_iso(timestamp_ms: int) -> str:
+        # То же, что datetime.fromtimestamp(ms / 1000, tz=utc).isoformat(), но без объектов datetime
+        seconds, millis = divmod(timestamp_ms, 1000)
+        parts = time.gmtime(seconds)
+        if not 1 <= parts.tm_year <= 9999:
+            return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).isoformat()
+        formatted = "%04d-%02d-%02dT%02d:%02d:%02d" % parts[:6]
+        if millis:
+            formatted += ".%03d000" % millis
+        return formatted + "+00:00"
 
     @staticmethod
     def _normalize_score(value: Any) -> Optional[float]:
@@ -1083,29 +1972,33 @@ class ClickUpAgent:
             normalized = max(1.0, min(5.0, normalized / 2.0))
         return max(1.0, min(5.0, normalized))
 
-    def _calculate_metric_average(
-        self, records: List[Dict[str, Any]], key: str
-    ) -> Optional[float]:
-        values: List[float] = []
-        for record in records:
-            normalized = self._normalize_score(record.get(key))
-            if normalized is not None:
-                values.append(normalized)
-        if not values:
-            return None
-        return sum(values) / len(values)
-
-    def _calculate_average_score(self, records: List[Dict[str, Any]]) -> Optional[float]:
+    @classmethod
+    def _calculate_history_averages(
+        cls, records: List[Dict[str, Any]]
+    ) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+        # Один проход по записям: каждая оценка нормализуется один раз
+        # и идёт сразу в средние скорости, качества и общий балл.
+        speeds: List[float] = []
+        qualities: List[float] = []
         combined: List[float] = []
         for record in records:
-            speed = self._normalize_score(record.get("speed"))
-            quality = self._normalize_score(record.get("quality"))
-            components = [value for value in (speed, quality) if value is not None]
-            if components:
-                combined.append(sum(components) / len(components))
-        if not combined:
-            return None
-        return sum(combined) / len(combined)
+            speed = cls._normalize_score(record.get("speed"))
+            quality = cls._normalize_score(record.get("quality"))
+            if speed is not None:
+                speeds.append(speed)
+                if quality is not None:
+                    qualities.append(quality)
+                    combined.append((speed + quality) / 2)
+                else:
+                    combined.append(speed)
+            elif quality is not None:
+                qualities.append(quality)
+                combined.append(quality)
+        return (
+            sum(speeds) / len(speeds) if speeds else None,
+            sum(qualities) / len(qualities) if qualities else None,
+            sum(combined) / len(combined) if combined else None,
+        )
 
     @staticmethod
     def _get_performer_category(avg_score: Optional[float]) -> str:
@@ -1139,13 +2032,13 @@ class ClickUpAgent:
 
     @staticmethod
     def _as_bool(value: Any) -> Optional[bool]:
-        if isinstance(value, bool):
+        if value is True or value is False:
             return value
         if isinstance(value, str):
             lowered = value.strip().lower()
-            if lowered in {"true", "yes", "y", "1"}:
+            if lowered in TRUE_TOKENS:
                 return True
-            if lowered in {"false", "no", "n", "0"}:
+            if lowered in FALSE_TOKENS:
                 return False
         if isinstance(value, (int, float)):
             if value == 1:
@@ -1160,7 +2053,7 @@ class ClickUpAgent:
             return "не указан"
         closed_raw = task.get("date_closed") or task.get("date_done")
         closed_timestamp = self._parse_clickup_timestamp(closed_raw)
-        now_timestamp = int(datetime.now(timezone.utc).timestamp() * 1000)
+        now_timestamp = self._now_ms()
         if closed_timestamp is None:
             return "в срок" if due_timestamp >= now_timestamp else "просрочено"
         return "в срок" if closed_timestamp <= due_timestamp else "просрочено"
@@ -1183,43 +2076,119 @@ class ClickUpAgent:
             return ""
 
         if stripped.startswith("```"):
-            lines = stripped.splitlines()
-            if lines:
-                # drop opening fence line
-                lines = lines[1:]
-            if lines and lines[-1].strip().startswith("```"):
-                lines = lines[:-1]
-            stripped = "\n".join(lines).strip()
+            # Срезаем открывающую строку ```lang и закрывающую ``` без разбиения на строки
+            match = JSON_FENCE_RE.fullmatch(stripped)
+            stripped = (match.group(1) or "").strip() if match else stripped
 
         return stripped
 
+    @staticmethod
+    def _decode_json_object(content: str) -> Optional[Dict[str, Any]]:
+        # raw_decode (реализован на C) сам находит конец объекта, поэтому текст
+        # до и после JSON не мешает разбору.
+        start = content.find("{")
+        while start != -1:
+            try:
+                data, _ = JSON_DECODER.raw_decode(content, start)
+            except json.JSONDecodeError:
+                pass
+            else:
+                if isinstance(data, dict):
+                    return data
+            start = content.find("{", start + 1)
+        return None
+
+    @staticmethod
+    def _decode_json_array(content: str) -> Optional[List[Any]]:
+        start = content.find("[")
+        while start != -1:
+            try:
+                data, _ = JSON_DECODER.raw_decode(content, start)
+            except json.JSONDecodeError:
+                pass
+            else:
+                if isinstance(data, list):
+                    return data
+            start = content.find("[", start + 1)
+        return None
+
+    @staticmethod
+    def _truncate_chars(value: str, max_chars: int) -> str:
+        if len(value) <= max_chars:
+            return value
+        cut = value[:max_chars]
+        boundary = cut.rfind(" ")
+        if boundary > max_chars // 2:
+            cut = cut[:boundary]
+        return cut.rstrip() + "…"
+
     @staticmethod
     def _truncate_words(value: str, max_words: int) -> str:
-        words = value.split()
+        # В строке из N слов не меньше 2N-1 символов: короткие строки не разбиваем вовсе
+        if len(value) <= 2 * max_words:
+            return value
+        words = value.split(None, max_words)
         if len(words) <= max_words:
             return value
         return " ".join(words[:max_words])
 
     def _prune_history_file(self) -> None:
+        with self._history_lock:
+            if not self._history_prune_pending:
+                return
+            self._history_prune_pending = False
+            self._history_appends_since_prune = 0
+            # os.replace подменяет файл, поэтому открытый на дозапись дескриптор закрываем
+            self._close_history_handle()
+            self._rewrite_history_file()
+
+    def _rewrite_history_file(self) -> None:
         if self.history_limit <= 0:
             return
-        if not self.history_path.exists():
-            return
+        # Первый проход запоминает только смещения концов записей; в память
+        # читается лишь хвост файла с последними history_limit записями.
+        # Пока записей не больше порога сжатия, файл не переписывается.
         try:
-            raw_content = self.history_path.read_text(encoding="utf-8")
-        except OSError as exc:
-            logging.warning("Не удалось прочитать историю для обрезки: %s", exc)
+            with self.history_path.open("rb") as handle:
+                entry_ends: Deque[int] = deque(maxlen=self.history_limit + 1)
+                entries_total = 0
+                offset = 0
+                has_tail = False
+                for raw_line in handle:
+                    offset += len(raw_line)
+                    stripped = raw_line.strip()
+                    if stripped == b"---":
+                        entry_ends.append(offset)
+                        entries_total += 1
+                        has_tail = False
+                    elif stripped:
+                        has_tail = True
+                if has_tail:
+                    entries_total += 1
+                if entries_total <= max(self.history_limit, self._history_compact_threshold):
+                    return
+                keep_from = entry_ends[-self.history_limit] if has_tail else entry_ends[0]
+                handle.seek(keep_from)
+                raw_content = handle.read().decode("utf-8")
+        except FileNotFoundError:
             return
-        entries = self._split_history_entries(raw_content)
-        if len(entries) <= self.history_limit:
+        except (OSError, UnicodeDecodeError) as exc:
+            logging.warning("Не удалось прочитать историю для обрезки: %s", exc)
             return
-        trimmed = entries[-self.history_limit :]
+        trimmed = self._split_history_entries(raw_content)
         new_content = "\n\n".join(entry.strip() for entry in trimmed if entry.strip())
         new_content = f"{new_content.rstrip()}\n"
+        # Пишем во временный файл и подменяем им историю: при сбое старый файл остаётся целым
+        tmp_path = self.history_path.with_name(f"{self.history_path.name}.tmp")
         try:
-            self.history_path.write_text(new_content, encoding="utf-8")
+            tmp_path.write_text(new_content, encoding="utf-8")
+            os.replace(tmp_path, self.history_path)
         except OSError as exc:
             logging.warning("Не удалось обрезать историю оценок: %s", exc)
+            tmp_path.unlink(missing_ok=True)
+            return
+        if self._history_records is not None:
+            self._history_stat = self._history_file_stat()
 
     @staticmethod
     def _split_history_entries(raw_content: str) -> List[str]:
@@ -1257,6 +2226,11 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Лимит обработанных задач за один запуск. По умолчанию без ограничения.",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Не использовать кэш карточек ClickUp между запусками.",
+    )
     return parser.parse_args()
 
 
@@ -1276,8 +2250,13 @@ def main() -> None:
             config.max_tasks = None
         else:
             config.max_tasks = args.max_tasks
+    if args.no_cache:
+        config.use_cache = False
     agent = ClickUpAgent(config=config, dry_run=args.dry_run)
-    agent.run()
+    try:
+        agent.run()
+    finally:
+        agent.close()
 
 
 if __name__ == "__main__":
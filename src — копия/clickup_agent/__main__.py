@@ -47,6 +47,11 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         action="store_true",
         help="Не записывать результаты обратно в ClickUp.",
     )
+    analyze_parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Отправить задачи через OpenAI Batch API (вдвое дешевле, ответ до 24 часов).",
+    )
     
     # Report command (new functionality)
     report_parser = subparsers.add_parser(
@@ -108,8 +113,9 @@ def run_analyze(args: argparse.Namespace, settings: Settings) -> int:
         settings = settings.model_copy(update={"dry_run": True})
 
     orchestrator = TaskOrchestrator(settings=settings)
+    run = orchestrator.run_batch if getattr(args, "batch", False) else orchestrator.run
 
-    results = orchestrator.run(
+    results = run(
         statuses=args.status if hasattr(args, "status") else None,
         assignee=args.assignee if hasattr(args, "assignee") else None,
     )
@@ -151,12 +157,13 @@ def run_report(args: argparse.Namespace, settings: Settings) -> int:
     if output_file:
         with open(output_file, "w", encoding="utf-8") as f:
             for report in reports:
-                f.write(report.to_markdown())
+                report.write_markdown(f)
                 f.write("\n\n" + "="*80 + "\n\n")
         logger.info("Отчёты сохранены в файл: %s", output_file)
     else:
         for report in reports:
-            print(report.to_markdown())
+            report.write_markdown(sys.stdout)
+            print()
             print("\n" + "="*80 + "\n")
     
     logger.info("Сгенерировано отчётов: %d", len(reports))
@@ -0,0 +1,161 @@
+"""Persistent cache for GPT responses."""
+
+from __future__ import annotations
+
+import math
+import operator
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class LLMCache:
+    """SQLite-backed cache of GPT responses that survives between runs.
+
+    Besides exact lookups by key it keeps L2-normalised embeddings of past
+    prompts, so near-identical tasks can reuse a stored response. Embeddings
+    are grouped by namespace, so vectors from different embedding models and
+    responses from different chat models are never compared. The cache is
+    safe to share between threads.
+    """
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, "
+            "value TEXT NOT NULL, "
+            "expires_at REAL)"
+        )
+        embedding_columns = {
+            row[1] for row in self._connection.execute("PRAGMA table_info(embeddings)")
+        }
+        if embedding_columns and "namespace" not in embedding_columns:
+            # Older caches do not record which models produced a vector, so
+            # their rows cannot be matched safely.
+            self._connection.execute("DROP TABLE embeddings")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, "
+            "namespace TEXT NOT NULL, "
+            "vector BLOB NOT NULL, "
+            "value TEXT NOT NULL, "
+            "expires_at REAL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_namespace ON embeddings (namespace)"
+        )
+        now = time.time()
+        for table in ("responses", "embeddings"):
+            self._connection.execute(
+                f"DELETE FROM {table} WHERE expires_at IS NOT NULL AND expires_at < ?",
+                (now,),
+            )
+        self._connection.commit()
+        self._vectors: Dict[str, List[Tuple[array, str, Optional[float]]]] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            return None
+        return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            self._connection.commit()
+
+    def find_similar(
+        self, vector: Sequence[float], threshold: float, *, namespace: str
+    ) -> Optional[str]:
+        """Return the stored response whose embedding is closest to ``vector``.
+
+        Only vectors stored under ``namespace`` are considered, and only
+        matches with cosine similarity above ``threshold`` are returned.
+        """
+
+        query = self._normalize(vector)
+        if query is None:
+            return None
+        # Scan a snapshot so that get/set from other threads are not blocked.
+        with self._lock:
+            candidates = list(self._load_vectors(namespace))
+        now = time.time()
+        best_score = threshold
+        best_value: Optional[str] = None
+        for stored, value, expires_at in candidates:
+            if len(stored) != len(query):
+                continue
+            if expires_at is not None and expires_at < now:
+                continue
+            score = sum(map(operator.mul, stored, query))
+            if score > best_score:
+                best_score = score
+                best_value = value
+        return best_value
+
+    def add_vector(
+        self,
+        key: str,
+        vector: Sequence[float],
+        value: str,
+        ttl: Optional[float] = None,
+        *,
+        namespace: str,
+    ) -> None:
+        normalized = self._normalize(vector)
+        if normalized is None:
+            return
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO embeddings (key, namespace, vector, value, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, namespace, normalized.tobytes(), value, expires_at),
+            )
+            self._connection.commit()
+            vectors = self._vectors.get(namespace)
+            if vectors is not None:
+                vectors.append((normalized, value, expires_at))
+
+    def _load_vectors(self, namespace: str) -> List[Tuple[array, str, Optional[float]]]:
+        vectors = self._vectors.get(namespace)
+        if vectors is None:
+            rows = self._connection.execute(
+                "SELECT vector, value, expires_at FROM embeddings WHERE namespace = ?",
+                (namespace,),
+            ).fetchall()
+            vectors = self._vectors[namespace] = []
+            for blob, value, expires_at in rows:
+                stored = array("f")
+                stored.frombytes(blob)
+                vectors.append((stored, value, expires_at))
+        return vectors
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> Optional[array]:
+        norm = math.sqrt(sum(value * value for value in vector))
+        if not norm:
+            return None
+        return array("f", (value / norm for value in vector))
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -2,14 +2,16 @@
 
 from __future__ import annotations
 
-import json
 import logging
-from typing import Iterable, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional
 
 import httpx
 from tenacity import RetryError, retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 from .config import Settings
+from .httpclient import build_client
+from .jsonutil import loads_json
 from .models import ClickUpTask
 
 logger = logging.getLogger(__name__)
@@ -24,7 +26,7 @@ class ClickUpClient:
 
     def __init__(self, settings: Settings) -> None:
         self._settings = settings
-        self._client = httpx.Client(
+        self._client = build_client(
             base_url="https://api.clickup.com/api/v2",
             headers={
                 "Authorization": settings.clickup_api_token,
@@ -52,9 +54,30 @@ class ClickUpClient:
     ) -> List[ClickUpTask]:
         """Fetch tasks from ClickUp."""
 
+        tasks = list(
+            self.iter_tasks(
+                limit=limit,
+                statuses=statuses,
+                assignee=assignee,
+                include_closed=include_closed,
+            )
+        )
+        logger.info("Fetched %d tasks from ClickUp", len(tasks))
+        return tasks
+
+    def iter_tasks(
+        self,
+        *,
+        limit: Optional[int] = None,
+        statuses: Optional[Iterable[str]] = None,
+        assignee: Optional[str] = None,
+        include_closed: bool = False,
+    ) -> Iterator[ClickUpTask]:
+        """Yield tasks from ClickUp page by page, without collecting them first."""
+
         limit = limit or self._settings.task_fetch_limit
         if limit <= 0:
-            return []
+            return
         params = {
             "archived": str(include_closed).lower(),
             "order_by": "updated",
@@ -81,33 +104,35 @@ class ClickUpClient:
 
         path = self._resolve_task_list_path()
 
-        tasks: List[ClickUpTask] = []
+        remaining = limit
         max_page_size = 100
         page_size = min(limit, max_page_size)
         page = 0
 
-        while len(tasks) < limit:
-            page_params = {
-                **params,
-                "page": page,
-                "limit": page_size,
-            }
-
-            data = self._request("GET", path, params=page_params)
-            tasks_payload = data.get("tasks", [])
-
-            if not tasks_payload:
-                break
+        def request_page(page: int) -> dict:
+            return self._request(
+                "GET", path, params={**params, "page": page, "limit": page_size}
+            )
 
-            tasks.extend(ClickUpTask.from_api(task) for task in tasks_payload)
+        # The next page is requested before the current one is parsed, so the
+        # HTTP round-trip overlaps with building ClickUpTask models.
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="clickup-page") as executor:
+            pending: Optional[Future[dict]] = executor.submit(request_page, page)
+            while pending is not None:
+                data = pending.result()
+                pending = None
+                tasks_payload = data.get("tasks", [])
 
-            if data.get("last_page"):
-                break
+                if not tasks_payload:
+                    break
 
-            page += 1
+                if not data.get("last_page") and len(tasks_payload) < remaining:
+                    page += 1
+                    pending = executor.submit(request_page, page)
 
-        logger.info("Fetched %d tasks from ClickUp", len(tasks))
-        return tasks[:limit]
+                for task in tasks_payload[:remaining]:
+                    yield ClickUpTask.from_api(task)
+                remaining -= len(tasks_payload)
 
     def update_task_custom_field(
         self,
@@ -157,8 +182,9 @@ class ClickUpClient:
         if not response.content:
             return {}
         try:
-            return response.json()
-        except json.JSONDecodeError:
+            # Decode the raw bytes directly; orjson is used when installed.
+            return loads_json(response.content)
+        except ValueError:
             logger.debug("Non-JSON response received from ClickUp, returning empty dict.")
             return {}
 
@@ -2,8 +2,8 @@
 
 from __future__ import annotations
 
-from functools import lru_cache
-from typing import List, Optional
+from functools import cached_property, lru_cache
+from typing import FrozenSet, List, Optional
 
 from zoneinfo import ZoneInfo
 
@@ -37,9 +37,22 @@ class Settings(BaseSettings):
     # OpenAI
     openai_api_key: str = Field(..., env="OPENAI_API_KEY")
     openai_model: str = Field("gpt-4o-mini", env="OPENAI_MODEL")
+    openai_base_url: Optional[str] = Field(None, env="OPENAI_BASE_URL")
+    gpt_stream_responses: bool = Field(True, env="GPT_STREAM_RESPONSES")
+    gpt_cache_path: Optional[str] = Field(
+        ".cache/gpt_responses.sqlite3", env="GPT_CACHE_PATH"
+    )
+    gpt_cache_ttl_seconds: int = Field(86400, env="GPT_CACHE_TTL_SECONDS")
+    gpt_semantic_cache_threshold: Optional[float] = Field(
+        None, env="GPT_SEMANTIC_CACHE_THRESHOLD"
+    )
+    openai_embedding_model: str = Field(
+        "text-embedding-3-small", env="OPENAI_EMBEDDING_MODEL"
+    )
 
     # Agent behaviour
     batch_size: int = Field(10, env="TASK_BATCH_SIZE")
+    gpt_group_size: int = Field(1, env="GPT_GROUP_SIZE")
     dry_run: bool = Field(False, env="DRY_RUN")
 
     model_config = SettingsConfigDict(
@@ -48,12 +61,18 @@ class Settings(BaseSettings):
         case_sensitive=False,
     )
 
-    @field_validator("task_fetch_limit", "batch_size")
+    @field_validator("task_fetch_limit", "batch_size", "gpt_group_size")
     def validate_positive_int(cls, value: int) -> int:
         if value <= 0:
             raise ValueError("Must be greater than zero")
         return value
 
+    @field_validator("gpt_semantic_cache_threshold")
+    def validate_similarity(cls, value: Optional[float]) -> Optional[float]:
+        if value is not None and not 0 < value <= 1:
+            raise ValueError("Must be in the (0, 1] range")
+        return value
+
     @property
     def report_timezone_zoneinfo(self) -> ZoneInfo:
         """Return report timezone as ZoneInfo instance."""
@@ -67,7 +86,7 @@ class Settings(BaseSettings):
                 return statuses
         return default
 
-    @property
+    @cached_property
     def report_completed_statuses_list(self) -> List[str]:
         """Statuses treated as completed in reports."""
 
@@ -76,7 +95,7 @@ class Settings(BaseSettings):
             ["closed", "complete", "completed"],
         )
 
-    @property
+    @cached_property
     def report_active_statuses_list(self) -> List[str]:
         """Statuses treated as active/in-progress in reports."""
 
@@ -85,6 +104,12 @@ class Settings(BaseSettings):
             ["open", "in progress", "to do"],
         )
 
+    @cached_property
+    def report_completed_statuses_set(self) -> FrozenSet[str]:
+        """Lower-cased completed statuses for membership checks."""
+
+        return frozenset(status.lower() for status in self.report_completed_statuses_list)
+
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
@@ -2,18 +2,61 @@
 
 from __future__ import annotations
 
+import functools
+import hashlib
 import json
 import logging
-from typing import Any, Dict
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from openai import APIError, OpenAI
-from tenacity import RetryError, retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+import httpx
+from tenacity import (
+    RetryCallState,
+    RetryError,
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+    wait_random,
+)
 
+from .cache import LLMCache
 from .config import Settings
+from .httpclient import build_client
+from .jsonutil import dumps_json, loads_json
 from .models import ClickUpTask, GPTRecommendation
 
 logger = logging.getLogger(__name__)
 
+OPENAI_API_BASE = "https://api.openai.com/v1"
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+RESPONSE_FIELDS_PROMPT = (
+    "complexity — одна из: низкая, средняя, высокая.\n"
+    "risks — массив кратких рисков.\n"
+    "recommendations — массив рекомендаций по выполнению.\n"
+    "optimizations — массив предложений по оптимизации.\n"
+    "Если информации мало, делай разумные предположения и объясняй их в списках."
+)
+
+# Static parts of the single-task prompt are assembled once at import time
+TASK_PROMPT_HEADER = (
+    "Контекст: Ты аналитик проектов, анализирующий задачу.\n"
+    "Данные задачи:\n"
+)
+TASK_PROMPT_FOOTER = (
+    "\n\nЗадача: Проанализируй задачу и предоставь JSON с ключами:\n"
+    + RESPONSE_FIELDS_PROMPT
+)
+
+RETRY_AFTER_MAX_SECONDS = 60.0
+
+BATCH_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+BATCH_POLL_INITIAL_SECONDS = 5.0
+BATCH_POLL_MAX_SECONDS = 300.0
+
 SYSTEM_PROMPT = (
     "Ты опытный аналитик проектов. Твоя задача — изучать карточки ClickUp "
     "и предлагать конкретные рекомендации. Говори лаконично, по делу, "
@@ -25,63 +68,449 @@ class GPTAnalysisError(Exception):
     """Raised when GPT analysis fails."""
 
 
+# Spelled out rather than wait_exponential_jitter: its arguments changed between
+# tenacity 8 and 9, and both are supported.
+_backoff_with_jitter = wait_exponential(multiplier=2, max=30) + wait_random(0, 2)
+
+
+def _retry_wait(retry_state: RetryCallState) -> float:
+    """Honour Retry-After from a 429/5xx response, otherwise back off with jitter.
+
+    The jitter keeps concurrent workers that hit the same rate limit from
+    retrying in lockstep.
+    """
+
+    exception = retry_state.outcome.exception() if retry_state.outcome else None
+    if isinstance(exception, httpx.HTTPStatusError):
+        retry_after = exception.response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(max(float(retry_after), 0.0), RETRY_AFTER_MAX_SECONDS)
+            except ValueError:
+                pass
+    return _backoff_with_jitter(retry_state)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_client(api_key: str, base_url: str) -> httpx.Client:
+    """Return the HTTP client shared by all analyzers with the same credentials.
+
+    Reusing one connection pool keeps TLS sessions warm between analyzer
+    instances; the clients live until the process exits.
+    """
+
+    return build_client(
+        base_url=base_url.rstrip("/"),
+        headers={
+            "Authorization": f"Bearer {api_key}",
+        },
+        # Per-attempt limits; the retry backoff is bounded separately.
+        timeout=httpx.Timeout(60.0, connect=10.0),
+    )
+
+
 class GPTAnalyzer:
     """Encapsulates interaction with OpenAI models."""
 
     def __init__(self, settings: Settings) -> None:
         self._settings = settings
-        self._client = OpenAI(api_key=settings.openai_api_key)
+        self._client = _get_client(
+            settings.openai_api_key,
+            settings.openai_base_url or OPENAI_API_BASE,
+        )
+        self._response_format = {"type": "json_object"}
+        if settings.openai_base_url:
+            # Local OpenAI-compatible servers often reject json_object.
+            self._response_format = {"type": "text"}
+        self._cache = self._open_cache(settings.gpt_cache_path)
+        self._semantic_namespace = self._semantic_cache_namespace()
+        self._stream_responses = settings.gpt_stream_responses
+        # The model, options and system prompt are identical for every call, so
+        # that part of the JSON body is encoded once; only the user message is
+        # serialised per request.
+        self._body_prefix = self._encode_body_prefix(stream=False)
+        self._stream_body_prefix = self._encode_body_prefix(stream=True)
+
+    def close(self) -> None:
+        # The HTTP client is shared between analyzers, so only the cache is closed.
+        if self._cache is not None:
+            self._cache.close()
+
+    def __enter__(self) -> "GPTAnalyzer":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:  # type: ignore[override]
+        self.close()
 
     def analyze(self, task: ClickUpTask) -> GPTRecommendation:
         """Generate a recommendation for a task."""
 
         prompt = self._build_prompt(task)
+        cache_key = self._cache_key(prompt)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            try:
+                recommendation = self._parse_response(cached)
+            except GPTAnalysisError:
+                logger.debug("Ignoring unparsable cached response for task %s", task.id)
+            else:
+                logger.debug("Using cached GPT response for task %s", task.id)
+                return recommendation
+
+        embedding = self._embed_task(task)
+        if embedding is not None:
+            similar = self._find_similar(embedding)
+            if similar is not None:
+                try:
+                    recommendation = self._parse_response(similar)
+                except GPTAnalysisError:
+                    logger.debug("Ignoring unparsable similar response for task %s", task.id)
+                else:
+                    logger.debug("Reusing GPT response of a similar task for %s", task.id)
+                    return recommendation
+
         logger.debug("Sending task %s to GPT", task.id)
 
         try:
             response_text = self._generate_response(prompt)
         except RetryError as exc:
             raise GPTAnalysisError("GPT API retry attempts exceeded.") from exc
+        except httpx.HTTPError as exc:
+            raise GPTAnalysisError(f"GPT API request failed: {exc}") from exc
+
+        recommendation = self._parse_response(response_text)
+        self._cache_set(cache_key, response_text, embedding)
+        return recommendation
 
+    def analyze_group(self, tasks: Sequence[ClickUpTask]) -> List[Optional[GPTRecommendation]]:
+        """Analyse several tasks with a single chat completion.
+
+        The result is aligned with ``tasks``. An entry is ``None`` when the
+        grouped answer could not be used for that task; callers should then
+        fall back to :meth:`analyze`.
+        """
+
+        recommendations: List[Optional[GPTRecommendation]] = [None] * len(tasks)
+        pending: List[Tuple[int, str]] = []
+        for index, task in enumerate(tasks):
+            cache_key = self._cache_key(self._build_prompt(task))
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                try:
+                    recommendations[index] = self._parse_response(cached)
+                    continue
+                except GPTAnalysisError:
+                    logger.debug("Ignoring unparsable cached response for task %s", task.id)
+            pending.append((index, cache_key))
+
+        if len(pending) < 2:
+            return recommendations
+
+        group = [tasks[index] for index, _ in pending]
+        logger.debug("Sending %d tasks to GPT in one request", len(group))
+        try:
+            response_text = self._generate_response(self._build_group_prompt(group))
+        except RetryError as exc:
+            raise GPTAnalysisError("GPT API retry attempts exceeded.") from exc
+        except httpx.HTTPError as exc:
+            raise GPTAnalysisError(f"GPT API request failed: {exc}") from exc
+
+        items = self._group_items(response_text)
+        if len(items) != len(pending):
+            logger.warning(
+                "GPT returned %d results for %d grouped tasks, falling back to single requests",
+                len(items),
+                len(pending),
+            )
+            return recommendations
+
+        for (index, cache_key), item in zip(pending, items):
+            try:
+                recommendations[index] = GPTRecommendation(**self._normalize_payload(item))
+            except (AttributeError, TypeError, ValueError):
+                logger.warning("Unusable grouped GPT result for task %s", tasks[index].id)
+                continue
+            self._cache_set(cache_key, json.dumps(item, ensure_ascii=False))
+        return recommendations
+
+    @staticmethod
+    def _group_items(response_text: str) -> List[Any]:
         try:
-            payload = json.loads(response_text)
+            payload = loads_json(response_text)
+        except ValueError:
+            logger.error("Failed to parse grouped GPT response: %s", response_text)
+            return []
+        if isinstance(payload, dict):
+            payload = payload.get("results")
+        return payload if isinstance(payload, list) else []
+
+    def analyze_batch(self, tasks: Sequence[ClickUpTask]) -> Dict[str, GPTRecommendation]:
+        """Analyse tasks through the OpenAI Batch API.
+
+        Blocks until the batch finishes and returns recommendations keyed by
+        task id; tasks whose request failed are missing from the result.
+        Cached responses are served without being sent.
+        """
+
+        recommendations: Dict[str, GPTRecommendation] = {}
+        pending: Dict[str, Tuple[str, str]] = {}
+        for task in tasks:
+            prompt = self._build_prompt(task)
+            cache_key = self._cache_key(prompt)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                try:
+                    recommendations[task.id] = self._parse_response(cached)
+                    continue
+                except GPTAnalysisError:
+                    logger.debug("Ignoring unparsable cached response for task %s", task.id)
+            pending[task.id] = (prompt, cache_key)
+
+        if not pending:
+            return recommendations
+
+        try:
+            output_file_id = self._run_batch(
+                {task_id: prompt for task_id, (prompt, _) in pending.items()}
+            )
+            responses = self._download_batch_results(output_file_id)
+        except (httpx.HTTPError, ValueError, KeyError, TypeError) as exc:
+            raise GPTAnalysisError(f"GPT batch request failed: {exc}") from exc
+
+        for task_id, (_, cache_key) in pending.items():
+            response_text = responses.get(task_id)
+            if response_text is None:
+                logger.error("GPT batch returned no result for task %s", task_id)
+                continue
+            try:
+                recommendation = self._parse_response(response_text)
+            except GPTAnalysisError:
+                continue
+            self._cache_set(cache_key, response_text)
+            recommendations[task_id] = recommendation
+        return recommendations
+
+    def _run_batch(self, prompts: Dict[str, str]) -> str:
+        """Upload one JSONL request per task, wait for the batch and return its output file id."""
+
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": task_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": self._completion_body(prompt),
+                },
+                ensure_ascii=False,
+            )
+            for task_id, prompt in prompts.items()
+        ]
+        upload = self._client.post(
+            "/files",
+            data={"purpose": "batch"},
+            files={"file": ("tasks.jsonl", "\n".join(lines).encode("utf-8"), "application/jsonl")},
+        )
+        upload.raise_for_status()
+
+        response = self._client.post(
+            "/batches",
+            json={
+                "input_file_id": upload.json()["id"],
+                "endpoint": "/v1/chat/completions",
+                "completion_window": "24h",
+            },
+        )
+        response.raise_for_status()
+        batch = response.json()
+        logger.info("Submitted GPT batch %s with %d tasks", batch["id"], len(lines))
+
+        delay = BATCH_POLL_INITIAL_SECONDS
+        while batch.get("status") not in BATCH_TERMINAL_STATUSES:
+            time.sleep(delay)
+            delay = min(delay * 2, BATCH_POLL_MAX_SECONDS)
+            response = self._client.get(f"/batches/{batch['id']}")
+            response.raise_for_status()
+            batch = response.json()
+            logger.debug("GPT batch %s status: %s", batch["id"], batch.get("status"))
+
+        if not batch.get("output_file_id"):
+            raise GPTAnalysisError(
+                f"GPT batch {batch['id']} finished with status {batch.get('status')}"
+            )
+        return batch["output_file_id"]
+
+    def _download_batch_results(self, file_id: str) -> Dict[str, str]:
+        response = self._client.get(f"/files/{file_id}/content")
+        response.raise_for_status()
+
+        results: Dict[str, str] = {}
+        for line in response.text.splitlines():
+            if not line.strip():
+                continue
+            item = loads_json(line)
+            body = (item.get("response") or {}).get("body") or {}
+            try:
+                content = body["choices"][0]["message"]["content"]
+            except (KeyError, IndexError, TypeError):
+                logger.error(
+                    "GPT batch request for task %s failed: %s",
+                    item.get("custom_id"),
+                    item.get("error") or body.get("error"),
+                )
+                continue
+            if content:
+                results[item["custom_id"]] = content
+        return results
+
+    def _parse_response(self, response_text: str) -> GPTRecommendation:
+        try:
+            payload = loads_json(response_text)
             recommendation = GPTRecommendation(**self._normalize_payload(payload))
-        except (json.JSONDecodeError, TypeError, ValueError) as exc:
+        except (TypeError, ValueError) as exc:
             logger.error("Failed to parse GPT response: %s", response_text)
             raise GPTAnalysisError("Failed to parse GPT response.") from exc
 
         return recommendation
 
+    @staticmethod
+    def _open_cache(path: Optional[str]) -> Optional[LLMCache]:
+        if not path:
+            return None
+        try:
+            return LLMCache(Path(path))
+        except (OSError, sqlite3.Error) as exc:
+            logger.warning("GPT response cache %s is unavailable: %s", path, exc)
+            return None
+
+    def _cache_key(self, prompt: str) -> str:
+        material = json.dumps(
+            {
+                "m": self._settings.openai_model,
+                "s": SYSTEM_PROMPT,
+                "u": prompt,
+                "t": 0.2,
+                "f": self._response_format,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _semantic_cache_namespace(self) -> str:
+        """Identify the models and prompts behind stored embeddings and responses."""
+
+        material = json.dumps(
+            {
+                "e": self._settings.openai_embedding_model,
+                "m": self._settings.openai_model,
+                "s": hashlib.sha256(SYSTEM_PROMPT.encode("utf-8")).hexdigest(),
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        if self._cache is None:
+            return None
+        try:
+            return self._cache.get(key)
+        except sqlite3.Error as exc:
+            logger.warning("Failed to read GPT response cache: %s", exc)
+            return None
+
+    def _cache_set(
+        self, key: str, value: str, embedding: Optional[List[float]] = None
+    ) -> None:
+        if self._cache is None:
+            return
+        ttl = self._settings.gpt_cache_ttl_seconds
+        try:
+            self._cache.set(key, value, ttl=ttl)
+            if embedding is not None:
+                self._cache.add_vector(
+                    key, embedding, value, ttl=ttl, namespace=self._semantic_namespace
+                )
+        except sqlite3.Error as exc:
+            logger.warning("Failed to write GPT response cache: %s", exc)
+
+    def _find_similar(self, embedding: List[float]) -> Optional[str]:
+        threshold = self._settings.gpt_semantic_cache_threshold
+        if self._cache is None or threshold is None:
+            return None
+        try:
+            return self._cache.find_similar(
+                embedding, threshold, namespace=self._semantic_namespace
+            )
+        except sqlite3.Error as exc:
+            logger.warning("Failed to read GPT embedding cache: %s", exc)
+            return None
+
+    def _embed_task(self, task: ClickUpTask) -> Optional[List[float]]:
+        """Embed task text for the semantic cache; ``None`` when it is disabled."""
+
+        if self._cache is None or self._settings.gpt_semantic_cache_threshold is None:
+            return None
+        text = f"{task.name}\n{task.description or ''}".strip()
+        try:
+            response = self._client.post(
+                "/embeddings",
+                json={"model": self._settings.openai_embedding_model, "input": text},
+            )
+            response.raise_for_status()
+            return [float(value) for value in response.json()["data"][0]["embedding"]]
+        except (httpx.HTTPError, ValueError, KeyError, IndexError, TypeError) as exc:
+            logger.warning("Failed to embed task %s, skipping semantic cache: %s", task.id, exc)
+            return None
+
     def _build_prompt(self, task: ClickUpTask) -> str:
-        description = task.description or "—"
-        due_date = task.due_date.isoformat() if task.due_date else "не указан"
-        status = task.status or "не указан"
-        priority = task.priority or "не указан"
-        url = task.url or "не указана"
+        return f"{TASK_PROMPT_HEADER}{self._task_details(task)}{TASK_PROMPT_FOOTER}"
 
+    def _build_group_prompt(self, tasks: Sequence[ClickUpTask]) -> str:
+        blocks = "\n\n".join(
+            f"### ЗАДАЧА {index}\n{self._task_details(task)}"
+            for index, task in enumerate(tasks, start=1)
+        )
+        return (
+            f"Контекст: Ты аналитик проектов, анализирующий {len(tasks)} задач.\n\n"
+            f"{blocks}\n\n"
+            "Задача: Проанализируй каждую задачу отдельно и предоставь JSON-объект "
+            f"с ключом results — массивом ровно из {len(tasks)} объектов в порядке "
+            "задач. Каждый объект содержит ключи:\n"
+            f"{RESPONSE_FIELDS_PROMPT}"
+        )
+
+    @staticmethod
+    def _task_details(task: ClickUpTask) -> str:
+        due_date = task.due_date
+        # One f-string compiles to a single BUILD_STRING: no intermediate locals or joins.
         return (
-            "Контекст: Ты аналитик проектов, анализирующий задачу.\n"
-            "Данные задачи:\n"
             f"- Название: {task.name}\n"
-            f"- Описание: {description}\n"
-            f"- Статус: {status}\n"
-            f"- Приоритет: {priority}\n"
-            f"- Дедлайн: {due_date}\n"
-            f"- Ссылка: {url}\n\n"
-            "Задача: Проанализируй задачу и предоставь JSON с ключами:\n"
-            "complexity — одна из: низкая, средняя, высокая.\n"
-            "risks — массив кратких рисков.\n"
-            "recommendations — массив рекомендаций по выполнению.\n"
-            "optimizations — массив предложений по оптимизации.\n"
-            "Если информации мало, делай разумные предположения и объясняй их в списках."
+            f"- Описание: {task.description or '—'}\n"
+            f"- Статус: {task.status or 'не указан'}\n"
+            f"- Приоритет: {task.priority or 'не указан'}\n"
+            f"- Дедлайн: {due_date.isoformat() if due_date else 'не указан'}\n"
+            f"- Ссылка: {task.url or 'не указана'}"
         )
 
     def _normalize_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(payload, dict):
+            raise ValueError("GPT response is not a JSON object.")
+        get = payload.get
+        normalize_list = self._normalize_list
+        parse_int = self._parse_optional_int
+        normalize_text = self._normalize_text
         return {
-            "complexity": payload.get("complexity", "").strip() or "не определена",
-            "risks": self._normalize_list(payload.get("risks")),
-            "recommendations": self._normalize_list(payload.get("recommendations")),
-            "optimizations": self._normalize_list(payload.get("optimizations")),
+            "complexity": normalize_text(get("complexity")) or "не определена",
+            "risks": normalize_list(get("risks")),
+            "recommendations": normalize_list(get("recommendations")),
+            "optimizations": normalize_list(get("optimizations")),
+            "optimal_time_minutes": parse_int(
+                get("optimal_time_minutes") or get("optimal_time") or get("optimal_minutes")
+            ),
+            "speed_score": parse_int(get("speed_score")),
+            "quality_score": parse_int(get("quality_score")),
+            "speed_reason": normalize_text(get("speed_reason")),
+            "quality_reason": normalize_text(get("quality_reason")),
         }
 
     @staticmethod
@@ -89,27 +518,152 @@ class GPTAnalyzer:
         if not value:
             return []
         if isinstance(value, list):
-            return [str(item).strip() for item in value if str(item).strip()]
+            # Each item is converted and stripped once
+            return [text for text in (str(item).strip() for item in value) if text]
         return [str(value).strip()]
 
+    def _encode_body_prefix(self, *, stream: bool) -> bytes:
+        body: Dict[str, Any] = {
+            "model": self._settings.openai_model,
+            "temperature": 0.2,
+            "response_format": self._response_format,
+        }
+        if stream:
+            body["stream"] = True
+            body["stream_options"] = {"include_usage": True}
+        body["messages"] = [{"role": "system", "content": SYSTEM_PROMPT}]
+        # Drop the closing "]}" so the user message can be appended.
+        return dumps_json(body)[:-2] + b',{"role":"user","content":'
+
+    @staticmethod
+    def _encode_body(prefix: bytes, prompt: str) -> bytes:
+        return prefix + dumps_json(prompt) + b"}]}"
+
+    def _completion_body(self, prompt: str) -> Dict[str, Any]:
+        return {
+            "model": self._settings.openai_model,
+            "temperature": 0.2,
+            "response_format": self._response_format,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+        }
+
     @retry(
-        retry=retry_if_exception_type(APIError),
-        wait=wait_exponential(multiplier=1, min=2, max=20),
+        retry=retry_if_exception_type(httpx.HTTPError),
+        wait=_retry_wait,
         stop=stop_after_attempt(5),
         reraise=True,
     )
     def _generate_response(self, prompt: str) -> str:
-        completion = self._client.chat.completions.create(
-            model=self._settings.openai_model,
-            temperature=0.2,
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": prompt},
-            ],
+        if self._stream_responses:
+            content = self._stream_completion(prompt)
+            if content is not None:
+                return content
+
+        response = self._client.post(
+            "/chat/completions",
+            content=self._encode_body(self._body_prefix, prompt),
+            headers=JSON_HEADERS,
         )
+        self._check_response(response)
+        try:
+            data = response.json()
+            content = data["choices"][0]["message"]["content"]
+        except (ValueError, KeyError, IndexError, TypeError) as exc:
+            raise GPTAnalysisError("Malformed response from GPT API.") from exc
+        self._log_usage(data.get("usage"))
+        if not content:
+            raise GPTAnalysisError("Empty response from GPT API.")
+        return content
 
-        message = completion.choices[0].message
-        if not message.content:
+    def _stream_completion(self, prompt: str) -> Optional[str]:
+        """Stream the completion and collect its text as chunks arrive.
+
+        Returns ``None`` when the server does not support streaming; the
+        analyzer then sticks to plain requests.
+        """
+
+        with self._client.stream(
+            "POST",
+            "/chat/completions",
+            content=self._encode_body(self._stream_body_prefix, prompt),
+            headers=JSON_HEADERS,
+        ) as response:
+            if response.status_code == 400:
+                response.read()
+                logger.info(
+                    "GPT API rejected a streaming request, using plain requests: %s",
+                    response.text[:200],
+                )
+                self._stream_responses = False
+                return None
+            if response.status_code >= 400:
+                response.read()
+            self._check_response(response)
+
+            parts: List[str] = []
+            usage: Optional[Dict[str, Any]] = None
+            for line in response.iter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    chunk = loads_json(data)
+                except ValueError:
+                    logger.debug("Skipping malformed stream chunk: %s", data[:200])
+                    continue
+                usage = chunk.get("usage") or usage
+                for choice in chunk.get("choices") or []:
+                    piece = (choice.get("delta") or {}).get("content")
+                    if piece:
+                        parts.append(piece)
+
+        self._log_usage(usage)
+        content = "".join(parts)
+        if not content:
             raise GPTAnalysisError("Empty response from GPT API.")
-        return message.content
+        return content
+
+    @staticmethod
+    def _check_response(response: httpx.Response) -> None:
+        if response.status_code == 429 or response.status_code >= 500:
+            logger.warning(
+                "GPT API returned %s. Retrying with backoff.", response.status_code
+            )
+            raise httpx.HTTPStatusError(
+                "Retryable GPT API error", request=response.request, response=response
+            )
+        if response.status_code >= 400:
+            raise GPTAnalysisError(
+                f"GPT API returned {response.status_code}: {response.text}"
+            )
+
+    @staticmethod
+    def _log_usage(usage: Optional[Dict[str, Any]]) -> None:
+        if usage:
+            logger.debug(
+                "GPT usage: prompt=%s completion=%s total=%s tokens",
+                usage.get("prompt_tokens"),
+                usage.get("completion_tokens"),
+                usage.get("total_tokens"),
+            )
+
+    @staticmethod
+    def _parse_optional_int(value: Any) -> Optional[int]:
+        if value in (None, ""):
+            return None
+        try:
+            return int(round(float(value)))
+        except (TypeError, ValueError, OverflowError):
+            return None
+
+    @staticmethod
+    def _normalize_text(value: Any) -> Optional[str]:
+        if value is None:
+            return None
+        text = str(value).strip()
+        return text or None
@@ -0,0 +1,24 @@
+"""Shared construction of the httpx clients used for ClickUp and OpenAI."""
+
+from __future__ import annotations
+
+import importlib.util
+from typing import Any
+
+import httpx
+
+# Sized well above the analysis/update pools so parallel requests never queue
+# for a free connection (httpx.PoolTimeout) under sustained load.
+HTTP_LIMITS = httpx.Limits(max_connections=256, max_keepalive_connections=128)
+
+# HTTP/2 multiplexes concurrent requests over one connection; it needs the
+# optional ``h2`` package (``pip install httpx[http2]``).
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def build_client(**kwargs: Any) -> httpx.Client:
+    """Create an ``httpx.Client`` with the shared pool limits and HTTP/2 when available."""
+
+    kwargs.setdefault("limits", HTTP_LIMITS)
+    kwargs.setdefault("http2", HTTP2_AVAILABLE)
+    return httpx.Client(**kwargs)
@@ -0,0 +1,27 @@
+"""JSON helpers that use orjson when it is installed."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speed-up
+    orjson = None
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """Decode JSON; raises ``ValueError`` (``json.JSONDecodeError``) on bad input."""
+
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(value: Any) -> bytes:
+    """Encode ``value`` as compact UTF-8 JSON without ASCII escaping."""
+
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
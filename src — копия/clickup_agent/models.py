@@ -2,11 +2,65 @@
 
 from __future__ import annotations
 
+import io
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Union
 
 from pydantic import BaseModel, Field
 
+# ClickUp sends millisecond timestamps; values above this bound are read as milliseconds.
+MS_TIMESTAMP_THRESHOLD = 10**11
+# Largest millisecond timestamp that still fits into datetime (9999-12-31T23:59:59.999Z)
+MAX_TIMESTAMP_MS = 253402300799999
+
+PRIORITY_EMOJI: Dict[str, str] = {
+    "urgent": "🟥",
+    "high": "🟥",
+    "normal": "🟨",
+    "medium": "🟨",
+    "low": "🟩",
+}
+DEFAULT_PRIORITY_EMOJI = "⚪"
+
+
+def _timestamp_input(value: Optional[str]) -> Union[int, datetime, None]:
+    """Prepare a ClickUp timestamp (milliseconds or seconds) for a datetime field.
+
+    Millisecond values are passed on as integers: pydantic-core turns them
+    into UTC datetimes natively, which is cheaper than ``fromtimestamp``.
+    Second-based values are rare and are converted here.
+    """
+    if not value:
+        return None
+    try:
+        timestamp = int(value)
+    except (ValueError, TypeError):
+        return None
+    if MS_TIMESTAMP_THRESHOLD < timestamp <= MAX_TIMESTAMP_MS:
+        return timestamp
+    try:
+        if timestamp > MS_TIMESTAMP_THRESHOLD:
+            return datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+    except (ValueError, OSError, OverflowError):
+        return None
+
+
+def epoch_microseconds(value: datetime) -> int:
+    """Convert an aware datetime to integer microseconds since the Unix epoch."""
+    return round(value.timestamp() * 1_000_000)
+
+
+def _optional_int(value: Optional[str]) -> Optional[int]:
+    """Parse a ClickUp duration in milliseconds; empty or malformed values give ``None``."""
+    if not value:
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
 
 class ClickUpTask(BaseModel):
     """Subset of ClickUp task attributes used by the agent."""
@@ -29,70 +83,44 @@ class ClickUpTask(BaseModel):
     def from_api(cls, payload: dict) -> "ClickUpTask":
         """Create a task instance from ClickUp's API payload."""
 
+        get = payload.get
         normalized = {
-            "id": payload.get("id"),
-            "name": payload.get("name", "").strip(),
-            "description": (payload.get("description") or "").strip() or None,
-            "status": (payload.get("status") or {}).get("status"),
-            "priority": (payload.get("priority") or {}).get("priority"),
-            "due_date": cls._parse_due_date(payload.get("due_date")),
-            "url": payload.get("url"),
-            "assignees": payload.get("assignees", []),
-            "time_estimate": cls._parse_time(payload.get("time_estimate")),
-            "time_spent": cls._parse_time(payload.get("time_spent")),
-            "date_closed": cls._parse_timestamp(payload.get("date_closed")),
-            "date_created": cls._parse_timestamp(payload.get("date_created")),
-            "date_updated": cls._parse_timestamp(payload.get("date_updated")),
+            "id": get("id"),
+            "name": get("name", "").strip(),
+            "description": (get("description") or "").strip() or None,
+            "status": (get("status") or {}).get("status"),
+            "priority": (get("priority") or {}).get("priority"),
+            "due_date": _timestamp_input(get("due_date")),
+            "url": get("url"),
+            "assignees": get("assignees", []),
+            "time_estimate": _optional_int(get("time_estimate")),
+            "time_spent": _optional_int(get("time_spent")),
+            "date_closed": _timestamp_input(get("date_closed")),
+            "date_created": _timestamp_input(get("date_created")),
+            "date_updated": _timestamp_input(get("date_updated")),
         }
         return cls(**normalized)
 
-    @staticmethod
-    def _parse_due_date(value: Optional[str]) -> Optional[datetime]:
-        if not value:
-            return None
-        try:
-            timestamp = int(value)
-            if timestamp > 10**11:
-                timestamp = timestamp / 1000
-            return datetime.fromtimestamp(timestamp, tz=timezone.utc)
-        except (ValueError, TypeError, OSError):
-            return None
-
-    @staticmethod
-    def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
-        """Parse timestamp from ClickUp API (milliseconds)."""
-        if not value:
-            return None
-        try:
-            timestamp = int(value)
-            if timestamp > 10**11:
-                timestamp = timestamp / 1000
-            return datetime.fromtimestamp(timestamp, tz=timezone.utc)
-        except (ValueError, TypeError, OSError):
-            return None
-
-    @staticmethod
-    def _parse_time(value: Optional[str]) -> Optional[int]:
-        """Parse time value from ClickUp API (milliseconds)."""
-        if not value:
-            return None
-        try:
-            return int(value)
-        except (ValueError, TypeError):
-            return None
+    @cached_property
+    def assignee_ids(self) -> List[str]:
+        """Assignee ids as strings, in ClickUp order (``"unknown"`` when missing)."""
+        return [str(assignee.get("id", "unknown")) for assignee in self.assignees]
+
+    @cached_property
+    def date_closed_us(self) -> Optional[int]:
+        """``date_closed`` as epoch microseconds, for cheap integer comparisons."""
+        return epoch_microseconds(self.date_closed) if self.date_closed else None
+
+    @cached_property
+    def due_date_us(self) -> Optional[int]:
+        """``due_date`` as epoch microseconds, for cheap integer comparisons."""
+        return epoch_microseconds(self.due_date) if self.due_date else None
 
     def get_priority_emoji(self) -> str:
         """Get emoji for task priority."""
-        priority_map = {
-            "urgent": "🟥",
-            "high": "🟥",
-            "normal": "🟨",
-            "medium": "🟨",
-            "low": "🟩",
-        }
         if not self.priority:
-            return "⚪"
-        return priority_map.get(self.priority.lower(), "⚪")
+            return DEFAULT_PRIORITY_EMOJI
+        return PRIORITY_EMOJI.get(self.priority.lower(), DEFAULT_PRIORITY_EMOJI)
 
     def get_time_estimate_hours(self) -> float:
         """Get time estimate in hours."""
@@ -112,6 +140,11 @@ class GPTRecommendation(BaseModel):
     risks: List[str]
     recommendations: List[str]
     optimizations: List[str]
+    optimal_time_minutes: Optional[int] = None
+    speed_score: Optional[int] = None
+    quality_score: Optional[int] = None
+    speed_reason: Optional[str] = None
+    quality_reason: Optional[str] = None
 
     def to_markdown(self) -> str:
         """Render recommendation as markdown block for ClickUp custom field."""
@@ -123,16 +156,21 @@ class GPTRecommendation(BaseModel):
             ("Оптимизации", self.optimizations),
         ]
 
-        lines = []
+        buffer = io.StringIO()
+        write = buffer.write
         for title, items in sections:
-            lines.append(f"### {title}")
+            write("### ")
+            write(title)
+            write("\n")
             if not items:
-                lines.append("- —")
+                write("- —\n")
             else:
                 for item in items:
-                    lines.append(f"- {item.strip()}")
-            lines.append("")
-        return "\n".join(lines).strip()
+                    write("- ")
+                    write(item.strip())
+                    write("\n")
+            write("\n")
+        return buffer.getvalue().strip()
 
 
 class TaskAnalysisResult(BaseModel):
@@ -2,14 +2,14 @@
 
 from __future__ import annotations
 
-import itertools
 import logging
-from typing import Iterable, List, Optional, Sequence
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, as_completed
+from typing import List, Optional, Sequence
 
 from .clickup import ClickUpClient, ClickUpAPIError
 from .config import Settings, get_settings
 from .gpt import GPTAnalyzer, GPTAnalysisError
-from .models import ClickUpTask, TaskAnalysisResult
+from .models import ClickUpTask, GPTRecommendation, TaskAnalysisResult
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +35,86 @@ class TaskOrchestrator:
     ) -> List[TaskAnalysisResult]:
         """Execute the end-to-end processing pipeline."""
 
+        tasks = self._fetch_tasks(statuses=statuses, assignee=assignee)
+        if not tasks:
+            return []
+
+        # Two stages run side by side: analysis workers wait on GPT, and as soon
+        # as a recommendation is ready its ClickUp write goes to the update pool,
+        # so the worker can start on the next task right away.
+        with ThreadPoolExecutor(
+            max_workers=self._settings.batch_size,
+            thread_name_prefix="clickup-update",
+        ) as update_pool, ThreadPoolExecutor(
+            max_workers=self._settings.batch_size,
+            thread_name_prefix="gpt-analysis",
+        ) as analysis_pool:
+            # All tasks are queued at once; the pool size alone bounds how many
+            # GPT requests are in flight, so a slow task never holds back the rest.
+            group_size = self._settings.gpt_group_size
+            if group_size > 1:
+                analyses = [
+                    analysis_pool.submit(
+                        self._process_group, tasks[start : start + group_size], update_pool
+                    )
+                    for start in range(0, len(tasks), group_size)
+                ]
+            else:
+                analyses = [
+                    analysis_pool.submit(self._process_group, [task], update_pool)
+                    for task in tasks
+                ]
+
+            for done, _ in enumerate(as_completed(analyses), start=1):
+                logger.info("Analysis progress: %d/%d", done, len(analyses))
+
+            updates = [update for analysis in analyses for update in analysis.result()]
+
+        return [result for result in (update.result() for update in updates) if result is not None]
+
+    def run_batch(
+        self,
+        *,
+        statuses: Optional[Sequence[str]] = None,
+        assignee: Optional[str] = None,
+    ) -> List[TaskAnalysisResult]:
+        """Run the pipeline through the OpenAI Batch API.
+
+        Meant for scheduled runs: all prompts go out as one batch at half the
+        token price, and the call blocks until the batch completes.
+        """
+
+        tasks = self._fetch_tasks(statuses=statuses, assignee=assignee)
+        if not tasks:
+            return []
+
+        try:
+            recommendations = self._analyzer.analyze_batch(tasks)
+        except GPTAnalysisError as exc:
+            logger.exception("GPT batch analysis failed: %s", exc)
+            return []
+
+        analysed = [task for task in tasks if task.id in recommendations]
+        results: List[TaskAnalysisResult] = []
+        with ThreadPoolExecutor(
+            max_workers=self._settings.batch_size,
+            thread_name_prefix="clickup-update",
+        ) as executor:
+            for result in executor.map(
+                lambda task: self._publish(task, recommendations[task.id]),
+                analysed,
+            ):
+                if result is not None:
+                    results.append(result)
+
+        return results
+
+    def _fetch_tasks(
+        self,
+        *,
+        statuses: Optional[Sequence[str]],
+        assignee: Optional[str],
+    ) -> List[ClickUpTask]:
         try:
             tasks = self._clickup.fetch_tasks(
                 statuses=statuses,
@@ -46,47 +126,63 @@ class TaskOrchestrator:
 
         if not tasks:
             logger.info("No tasks returned by ClickUp query.")
-            return []
+        return tasks
 
-        results: List[TaskAnalysisResult] = []
+    def _process_group(
+        self,
+        tasks: Sequence[ClickUpTask],
+        update_pool: Executor,
+    ) -> List[Future[Optional[TaskAnalysisResult]]]:
+        if len(tasks) == 1:
+            update = self._process_task(tasks[0], update_pool)
+            return [] if update is None else [update]
 
-        for chunk in self._chunk(tasks, self._settings.batch_size):
-            logger.info("Processing batch of %d tasks", len(chunk))
-            for task in chunk:
-                try:
-                    recommendation = self._analyzer.analyze(task)
-                    rendered = recommendation.to_markdown()
-                    self._clickup.update_task_custom_field(
-                        task_id=task.id,
-                        field_id=None,
-                        value=rendered,
-                    )
-                    results.append(
-                        TaskAnalysisResult(
-                            task=task,
-                            recommendation=recommendation,
-                            raw_response=rendered,
-                        )
-                    )
-                except GPTAnalysisError as exc:
-                    logger.exception(
-                        "GPT analysis failed for task %s: %s", task.id, exc
-                    )
-                except ClickUpAPIError as exc:
-                    logger.exception(
-                        "Failed to update ClickUp for task %s: %s", task.id, exc
-                    )
+        try:
+            recommendations = self._analyzer.analyze_group(tasks)
+        except GPTAnalysisError as exc:
+            logger.warning("Grouped GPT analysis failed, analysing tasks one by one: %s", exc)
+            recommendations = [None] * len(tasks)
 
-        return results
+        updates: List[Future[Optional[TaskAnalysisResult]]] = []
+        for task, recommendation in zip(tasks, recommendations):
+            if recommendation is None:
+                update = self._process_task(task, update_pool)
+            else:
+                update = update_pool.submit(self._publish, task, recommendation)
+            if update is not None:
+                updates.append(update)
+        return updates
+
+    def _process_task(
+        self,
+        task: ClickUpTask,
+        update_pool: Executor,
+    ) -> Optional[Future[Optional[TaskAnalysisResult]]]:
+        try:
+            recommendation = self._analyzer.analyze(task)
+        except GPTAnalysisError as exc:
+            logger.exception("GPT analysis failed for task %s: %s", task.id, exc)
+            return None
+        return update_pool.submit(self._publish, task, recommendation)
+
+    def _publish(
+        self,
+        task: ClickUpTask,
+        recommendation: GPTRecommendation,
+    ) -> Optional[TaskAnalysisResult]:
+        try:
+            rendered = recommendation.to_markdown()
+            self._clickup.update_task_custom_field(
+                task_id=task.id,
+                field_id=None,
+                value=rendered,
+            )
+        except ClickUpAPIError as exc:
+            logger.exception("Failed to update ClickUp for task %s: %s", task.id, exc)
+            return None
 
-    @staticmethod
-    def _chunk(
-        iterable: Sequence[ClickUpTask],
-        size: int,
-    ) -> Iterable[Sequence[ClickUpTask]]:
-        it = iter(iterable)
-        while True:
-            batch = list(itertools.islice(it, size))
-            if not batch:
-                break
-            yield batch
+        return TaskAnalysisResult(
+            task=task,
+            recommendation=recommendation,
+            raw_response=rendered,
+        )
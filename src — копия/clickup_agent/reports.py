@@ -2,22 +2,34 @@
 
 from __future__ import annotations
 
+import functools
+import io
 import logging
-from collections import defaultdict
-from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, TextIO
 
 from pydantic import BaseModel, Field
 
 from .clickup import ClickUpClient
 from .config import Settings
-from .models import ClickUpTask
+from .models import ClickUpTask, epoch_microseconds
 
 logger = logging.getLogger(__name__)
 
+PRIORITY_ORDER = (("Высокая", "urgent"), ("Средняя", "normal"), ("Низкая", "low"))
+# ClickUp priority names mapped to report buckets; anything else counts as "low".
+PRIORITY_BUCKETS = {"urgent": "urgent", "high": "urgent", "normal": "normal", "medium": "normal"}
 
-class TaskStats(BaseModel):
-    """Statistics for a single task."""
+
+@dataclass(slots=True)
+class TaskStats:
+    """Statistics for a single task.
+
+    Built internally for every fetched task, so it is a plain slotted
+    dataclass rather than a validated pydantic model.
+    """
 
     name: str
     priority_emoji: str
@@ -28,13 +40,37 @@ class TaskStats(BaseModel):
     days_overdue: int = 0
 
 
-class PriorityStats(BaseModel):
+class _TaskFacts(NamedTuple):
+    """Per-task values that do not depend on which employee the report is for."""
+
+    stats: TaskStats
+    priority_key: str
+    is_rescheduled: bool
+    is_long_overdue: bool
+
+
+@dataclass(slots=True)
+class PriorityStats:
     """Statistics grouped by priority."""
 
     completed: int = 0
     not_completed: int = 0
 
 
+@functools.lru_cache(maxsize=64)
+def _format_report_date(day: date) -> str:
+    """Format a report date; all reports of one run share the same date.
+
+    Keyed by the calendar date: aware datetimes for the same instant in
+    different timezones compare equal but fall on different days.
+    """
+    return day.strftime("%d.%m.%Y")
+
+
+# Read-only default for priorities missing from a report; never mutate it.
+_EMPTY_PRIORITY_STATS = PriorityStats()
+
+
 class EmployeeReport(BaseModel):
     """Daily report for a single employee."""
 
@@ -51,58 +87,57 @@ class EmployeeReport(BaseModel):
 
     def to_markdown(self) -> str:
         """Render report as markdown."""
-        lines = []
-        date_str = self.date.strftime("%d.%m.%Y")
-
-        # Header
-        lines.append(f"📊 Отчёт за {date_str}")
-        lines.append(f"👤 Сотрудник: {self.employee_name}")
-        lines.append("")
-
-        # Completed tasks
-        lines.append(f"✅ Выполнено задач: {len(self.completed_tasks)}")
+        buffer = io.StringIO()
+        self.write_markdown(buffer)
+        return buffer.getvalue()
+
+    def write_markdown(self, out: TextIO) -> None:
+        """Write the report as markdown to ``out``, one section at a time."""
+        write = out.write
+        date_str = _format_report_date(self.date.date())
+
+        # Header and completed tasks
+        write(
+            f"📊 Отчёт за {date_str}\n"
+            f"👤 Сотрудник: {self.employee_name}\n"
+            f"\n✅ Выполнено задач: {len(self.completed_tasks)}\n"
+        )
         if self.completed_tasks:
             for task in self.completed_tasks:
-                time_info = f"(План: {task.time_estimate_hours:.1f}ч / Факт: {task.time_spent_hours:.1f}ч)"
-                lines.append(f"  {task.name} {task.priority_emoji} {time_info}")
+                write(
+                    f"  {task.name} {task.priority_emoji} "
+                    f"(План: {task.time_estimate_hours:.1f}ч / Факт: {task.time_spent_hours:.1f}ч)\n"
+                )
         else:
-            lines.append("  Нет выполненных задач")
-        lines.append("")
+            write("  Нет выполненных задач\n")
 
         # Time statistics
         time_diff = self.total_actual_hours - self.total_planned_hours
         time_diff_sign = "+" if time_diff >= 0 else ""
-        lines.append("⏱️ Время:")
-        lines.append(f"  Плановое: {self.total_planned_hours:.1f} ч")
-        lines.append(f"  Фактическое: {self.total_actual_hours:.1f} ч")
-        lines.append(f"  Разница: {time_diff_sign}{time_diff:.1f} ч")
-        lines.append("")
+        write(
+            "\n⏱️ Время:\n"
+            f"  Плановое: {self.total_planned_hours:.1f} ч\n"
+            f"  Фактическое: {self.total_actual_hours:.1f} ч\n"
+            f"  Разница: {time_diff_sign}{time_diff:.1f} ч\n"
+            "\n⚡ Срочность:\n"
+        )
 
         # Priority statistics
-        lines.append("⚡ Срочность:")
-        priority_order = [("Высокая", "urgent"), ("Средняя", "normal"), ("Низкая", "low")]
-        for label, key in priority_order:
-            stats = self.priority_stats.get(key, PriorityStats())
-            lines.append(
-                f"  {label}: выполнено {stats.completed}, не выполнено {stats.not_completed}"
-            )
-        lines.append("")
+        for label, key in PRIORITY_ORDER:
+            stats = self.priority_stats.get(key, _EMPTY_PRIORITY_STATS)
+            write(f"  {label}: выполнено {stats.completed}, не выполнено {stats.not_completed}\n")
 
         # Rescheduled tasks
         if self.rescheduled_tasks:
-            lines.append(f"📌 Перенесено задач по дедлайну: {len(self.rescheduled_tasks)}")
+            write(f"\n📌 Перенесено задач по дедлайну: {len(self.rescheduled_tasks)}\n")
             for task_name in self.rescheduled_tasks:
-                lines.append(f"  {task_name}")
-            lines.append("")
+                write(f"  {task_name}\n")
 
         # Overdue tasks
         if self.overdue_tasks:
-            lines.append(f"⏳ Просрочено более чем на 1 день: {len(self.overdue_tasks)}")
+            write(f"\n⏳ Просрочено более чем на 1 день: {len(self.overdue_tasks)}\n")
             for task_name in self.overdue_tasks:
-                lines.append(f"  {task_name}")
-            lines.append("")
-
-        return "\n".join(lines)
+                write(f"  {task_name}\n")
 
 
 class DailyReportGenerator:
@@ -139,22 +174,57 @@ class DailyReportGenerator:
             logger.warning("No tasks found for the specified date")
             return []
 
-        # Group tasks by employee
-        employee_tasks = self._group_tasks_by_employee(all_tasks)
-
-        # Generate reports for each employee
-        reports = []
-        for employee_id, tasks in self._iter_sorted_employee_tasks(employee_tasks):
-            employee_name = self._extract_employee_name(employee_id, tasks)
-            report = self._generate_employee_report(
-                employee_id,
-                employee_name,
-                tasks,
-                target_day_local,
-                target_day_start_utc,
-                next_day_utc,
+        # Build every report in a single pass over the tasks. Tasks with several
+        # assignees appear in several reports; evaluate dates and priorities
+        # once per task rather than once per assignee.
+        # target_day_start_utc and target_day_local are the same instant, as are
+        # next_day_utc and next_day_local, so one pair of bounds serves both the
+        # completion and the deadline checks.
+        target_day_start_us = epoch_microseconds(target_day_start_utc)
+        next_day_us = epoch_microseconds(next_day_utc)
+        employee_reports: Dict[str, EmployeeReport] = {}
+
+        for task in all_tasks:
+            facts = self._task_facts(task, target_day_local, target_day_start_us, next_day_us)
+            task_stat = facts.stats
+
+            # Tasks without assignees go to the "unassigned" report
+            for employee_id in task.assignee_ids or ("unassigned",):
+                report = employee_reports.get(employee_id)
+                if report is None:
+                    report = employee_reports[employee_id] = self._new_employee_report(
+                        employee_id, task, target_day_local
+                    )
+
+                # Add to appropriate list
+                if task_stat.is_completed:
+                    report.completed_tasks.append(task_stat)
+                    report.priority_stats[facts.priority_key].completed += 1
+                else:
+                    report.not_completed_tasks.append(task_stat)
+                    report.priority_stats[facts.priority_key].not_completed += 1
+
+                if facts.is_rescheduled:
+                    report.rescheduled_tasks.append(task.name)
+
+                if facts.is_long_overdue:
+                    report.overdue_tasks.append(task.name)
+
+        # Totals are written once per report: assigning to a pydantic model
+        # field is comparatively slow.
+        for report in employee_reports.values():
+            report.total_planned_hours = sum(
+                task_stat.time_estimate_hours for task_stat in report.completed_tasks
             )
-            reports.append(report)
+            report.total_actual_hours = sum(
+                task_stat.time_spent_hours for task_stat in report.completed_tasks
+            )
+
+        # Deterministic order
+        reports = sorted(
+            employee_reports.values(),
+            key=lambda report: (report.employee_name.lower(), report.employee_id),
+        )
 
         logger.info("Generated %d employee reports", len(reports))
         return reports
@@ -173,159 +243,155 @@ class DailyReportGenerator:
         ]
         normalized_statuses_lower = {status.lower() for status in normalized_statuses}
         completed_statuses = self._settings.report_completed_statuses_list
-        completed_statuses_lower = {status.lower() for status in completed_statuses}
+        completed_statuses_lower = self._settings.report_completed_statuses_set
         active_statuses = self._settings.report_active_statuses_list
 
+        # Filter tasks by date and provided criteria. Dates are compared as epoch
+        # microseconds: ClickUp datetimes carry pydantic's own UTC tzinfo, which
+        # makes every aware datetime comparison go through utcoffset().
+        assignee_id = str(assignee) if assignee else None
+        target_day_start_us = epoch_microseconds(target_day_start_utc)
+        next_day_us = epoch_microseconds(next_day_utc)
+
+        def collect(tasks: Iterable[ClickUpTask]) -> List[ClickUpTask]:
+            # Tasks are filtered as they are streamed, so only one page of
+            # unfiltered tasks is held in memory at a time.
+            filtered_tasks: List[ClickUpTask] = []
+            for task in tasks:
+                status_lower = (task.status or "").lower()
+                if normalized_statuses_lower and status_lower not in normalized_statuses_lower:
+                    continue
+
+                if assignee_id and assignee_id not in task.assignee_ids:
+                    continue
+
+                # Include if closed on target date
+                date_closed_us = task.date_closed_us
+                if date_closed_us is not None and target_day_start_us <= date_closed_us < next_day_us:
+                    filtered_tasks.append(task)
+                    continue
+
+                due_date_us = task.due_date_us
+                if due_date_us is not None:
+                    # Include if due date is on or before target date
+                    if due_date_us <= next_day_us:
+                        filtered_tasks.append(task)
+                elif status_lower not in completed_statuses_lower:
+                    # Include active tasks without due dates
+                    filtered_tasks.append(task)
+            return filtered_tasks
+
         if normalized_statuses:
-            fetched_tasks = self._clickup.fetch_tasks(
-                statuses=normalized_statuses,
-                assignee=assignee,
-                include_closed=True,
-            )
-        else:
-            # Fetch completed tasks
-            completed_tasks = self._clickup.fetch_tasks(
-                statuses=completed_statuses,
-                assignee=assignee,
-                include_closed=True,
+            return collect(
+                self._clickup.iter_tasks(
+                    statuses=normalized_statuses,
+                    assignee=assignee,
+                    include_closed=True,
+                )
             )
 
-            # Fetch in-progress and open tasks
-            active_tasks = self._clickup.fetch_tasks(
-                statuses=active_statuses,
-                assignee=assignee,
-                include_closed=False,
+        # Completed and active tasks are independent queries, so both
+        # paginated fetches run at the same time.
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="clickup-fetch") as executor:
+            completed_future = executor.submit(
+                collect,
+                self._clickup.iter_tasks(
+                    statuses=completed_statuses,
+                    assignee=assignee,
+                    include_closed=True,
+                ),
             )
-
-            fetched_tasks = [*completed_tasks, *active_tasks]
-
-        # Filter tasks by date and provided criteria
-        filtered_tasks: List[ClickUpTask] = []
-
-        for task in fetched_tasks:
-            if normalized_statuses_lower and (task.status or "").lower() not in normalized_statuses_lower:
-                continue
-
-            if assignee and not any(
-                str(member.get("id")) == str(assignee) for member in task.assignees
-            ):
-                continue
-
-            # Include if closed on target date
-            closed_on_target_day = bool(
-                task.date_closed
-                and target_day_start_utc <= task.date_closed < next_day_utc
+            active_future = executor.submit(
+                collect,
+                self._clickup.iter_tasks(
+                    statuses=active_statuses,
+                    assignee=assignee,
+                    include_closed=False,
+                ),
             )
-            if closed_on_target_day:
-                filtered_tasks.append(task)
-                continue
+            completed_tasks = completed_future.result()
+            active_tasks = active_future.result()
 
-            # Include if due date is on or before target date
-            if task.due_date and task.due_date <= next_day_utc:
-                filtered_tasks.append(task)
+        # A task whose status changes during the fetch can be returned by both
+        # queries; keep its first occurrence so it is counted only once.
+        seen_ids: Set[str] = set()
+        filtered_tasks: List[ClickUpTask] = []
+        for task in (*completed_tasks, *active_tasks):
+            if task.id in seen_ids:
                 continue
-
-            # Include active tasks without due dates
-            status_lower = (task.status or "").lower()
-            if not task.due_date and status_lower not in completed_statuses_lower:
-                filtered_tasks.append(task)
-
+            seen_ids.add(task.id)
+            filtered_tasks.append(task)
         return filtered_tasks
 
-    def _group_tasks_by_employee(
-        self, tasks: List[ClickUpTask]
-    ) -> Dict[str, List[ClickUpTask]]:
-        """Group tasks by employee ID."""
-        employee_tasks: Dict[str, List[ClickUpTask]] = defaultdict(list)
+    def _task_facts(
+        self,
+        task: ClickUpTask,
+        target_day_local: datetime,
+        target_day_start_us: int,
+        next_day_us: int,
+    ) -> _TaskFacts:
+        """Evaluate completion, deadline and priority of a task for the target day."""
+        # Determine if task is completed
+        date_closed_us = task.date_closed_us
+        is_completed = (
+            date_closed_us is not None and target_day_start_us <= date_closed_us < next_day_us
+        )
 
-        for task in tasks:
-            if not task.assignees:
-                # Assign to "Unassigned" group
-                employee_tasks["unassigned"].append(task)
-            else:
-                for assignee in task.assignees:
-                    employee_id = assignee.get("id", "unknown")
-                    employee_tasks[employee_id].append(task)
+        # Calculate overdue status
+        is_overdue = False
+        days_overdue = 0
+        due_date_us = task.due_date_us
+        if due_date_us is not None and due_date_us < target_day_start_us:
+            is_overdue = True
+            # Count wall-clock days in the report timezone, so a DST shift
+            # between the deadline and the report day does not add a day.
+            # Only overdue tasks pay for the timezone conversion.
+            due_local = task.due_date.astimezone(self._report_timezone)
+            days_overdue = (target_day_local - due_local).days
+
+        stats = TaskStats(
+            name=task.name,
+            priority_emoji=task.get_priority_emoji(),
+            time_estimate_hours=task.get_time_estimate_hours(),
+            time_spent_hours=task.get_time_spent_hours(),
+            is_completed=is_completed,
+            is_overdue=is_overdue,
+            days_overdue=days_overdue,
+        )
 
-        return employee_tasks
+        # Rescheduled: due date was today but not completed
+        is_rescheduled = (
+            not is_completed
+            and due_date_us is not None
+            and target_day_start_us <= due_date_us < next_day_us
+        )
+
+        return _TaskFacts(
+            stats=stats,
+            priority_key=self._normalize_priority(task.priority),
+            is_rescheduled=is_rescheduled,
+            # Overdue by more than 1 day
+            is_long_overdue=not is_completed and days_overdue > 1,
+        )
 
-    def _generate_employee_report(
+    def _new_employee_report(
         self,
         employee_id: str,
-        employee_name: str,
-        tasks: List[ClickUpTask],
+        task: ClickUpTask,
         target_day_local: datetime,
-        target_day_start_utc: datetime,
-        next_day_utc: datetime,
     ) -> EmployeeReport:
-        """Generate report for a single employee."""
-        next_day_local = target_day_local + timedelta(days=1)
-
-        report = EmployeeReport(
+        """Create an empty report for an employee first seen on ``task``."""
+        return EmployeeReport(
             employee_id=employee_id,
-            employee_name=employee_name,
+            employee_name=self._extract_employee_name(employee_id, task),
             date=target_day_local,
+            priority_stats={
+                "urgent": PriorityStats(),
+                "normal": PriorityStats(),
+                "low": PriorityStats(),
+            },
         )
 
-        # Initialize priority stats
-        report.priority_stats = {
-            "urgent": PriorityStats(),
-            "normal": PriorityStats(),
-            "low": PriorityStats(),
-        }
-
-        for task in tasks:
-            # Determine if task is completed
-            is_completed = bool(
-                task.date_closed
-                and target_day_start_utc <= task.date_closed < next_day_utc
-            )
-
-            # Calculate overdue status
-            is_overdue = False
-            days_overdue = 0
-            due_local = task.due_date.astimezone(self._report_timezone) if task.due_date else None
-            if due_local and due_local < target_day_local:
-                is_overdue = True
-                days_overdue = (target_day_local - due_local).days
-
-            # Create task stats
-            task_stat = TaskStats(
-                name=task.name,
-                priority_emoji=task.get_priority_emoji(),
-                time_estimate_hours=task.get_time_estimate_hours(),
-                time_spent_hours=task.get_time_spent_hours(),
-                is_completed=is_completed,
-                is_overdue=is_overdue,
-                days_overdue=days_overdue,
-            )
-
-            # Add to appropriate list
-            if is_completed:
-                report.completed_tasks.append(task_stat)
-                report.total_planned_hours += task_stat.time_estimate_hours
-                report.total_actual_hours += task_stat.time_spent_hours
-            else:
-                report.not_completed_tasks.append(task_stat)
-
-            # Update priority stats
-            priority_key = self._normalize_priority(task.priority)
-            if is_completed:
-                report.priority_stats[priority_key].completed += 1
-            else:
-                report.priority_stats[priority_key].not_completed += 1
-
-            # Check for rescheduled tasks (due date was today but not completed)
-            if not is_completed and due_local:
-                if target_day_local <= due_local < next_day_local:
-                    report.rescheduled_tasks.append(task.name)
-
-            # Check for overdue tasks (more than 1 day)
-            if not is_completed and days_overdue > 1:
-                report.overdue_tasks.append(task.name)
-
-        return report
-
     def _normalize_target_date(self, target_date: Optional[datetime]) -> datetime:
         """Normalize target date to start of day in report timezone."""
 
@@ -338,41 +404,25 @@ class DailyReportGenerator:
                 base = target_date.astimezone(self._report_timezone)
         return base.replace(hour=0, minute=0, second=0, microsecond=0)
 
-    def _extract_employee_name(self, employee_id: str, tasks: List[ClickUpTask]) -> str:
-        """Determine employee display name from tasks."""
+    def _extract_employee_name(self, employee_id: str, task: ClickUpTask) -> str:
+        """Determine employee display name from the first task assigned to them."""
 
         if employee_id == "unassigned":
             return "Без исполнителя"
 
-        for task in tasks:
-            for assignee in task.assignees:
-                if str(assignee.get("id")) == str(employee_id):
-                    return assignee.get("username") or assignee.get("email") or "Неизвестный"
+        for assignee_id, assignee in zip(task.assignee_ids, task.assignees):
+            if assignee_id == employee_id:
+                return assignee.get("username") or assignee.get("email") or "Неизвестный"
 
         return "Неизвестный"
 
-    def _iter_sorted_employee_tasks(
-        self, employee_tasks: Dict[str, List[ClickUpTask]]
-    ) -> List[tuple[str, List[ClickUpTask]]]:
-        """Iterate over employee tasks in a deterministic order."""
-
-        return sorted(
-            employee_tasks.items(),
-            key=lambda item: (
-                self._extract_employee_name(item[0], item[1]).lower(),
-                str(item[0]),
-            ),
-        )
-
     @staticmethod
+    @functools.lru_cache(maxsize=16)
     def _normalize_priority(priority: Optional[str]) -> str:
-        """Normalize priority to standard keys."""
+        """Normalize priority to standard keys.
+
+        ClickUp only has a handful of priority names, so a small cache covers them.
+        """
         if not priority:
             return "normal"
-        priority_lower = priority.lower()
-        if priority_lower in ["urgent", "high"]:
-            return "urgent"
-        elif priority_lower in ["normal", "medium"]:
-            return "normal"
-        else:
-            return "low"
+        return PRIORITY_BUCKETS.get(priority.lower(), "low")
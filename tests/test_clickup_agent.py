@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.clickup_agent import DEFAULT_LM_CONCURRENCY, AgentConfig, ClickUpAgent
+
+
+class FakeLMResponse:
+    status_code = 200
+    headers = {"Content-Type": "application/json"}
+    content = b'{"choices": []}'
+
+    def __enter__(self) -> "FakeLMResponse":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+    def raise_for_status(self) -> None:
+        return None
+
+
+def _make_agent(tmp_path: Path, **overrides: object) -> ClickUpAgent:
+    config = AgentConfig(
+        api_token="token",
+        speed_field_id="speed",
+        quality_field_id="quality",
+        history_log_path=str(tmp_path / "assessments.md"),
+        use_cache=False,
+        **overrides,
+    )
+    return ClickUpAgent(config, dry_run=True)
+
+
+def test_lm_concurrency_defaults_below_task_concurrency(tmp_path: Path) -> None:
+    agent = _make_agent(tmp_path, concurrency=6)
+    try:
+        assert agent.lm_concurrency == DEFAULT_LM_CONCURRENCY < agent.concurrency
+    finally:
+        agent.close()
+
+
+def test_lm_requests_are_bounded_by_lm_concurrency(tmp_path: Path) -> None:
+    agent = _make_agent(tmp_path, concurrency=6, lm_concurrency=2)
+    agent._lm_streaming = False
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def fake_post(*args: object, **kwargs: object) -> FakeLMResponse:
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight -= 1
+        return FakeLMResponse()
+
+    agent.session.post = fake_post  # type: ignore[method-assign]
+    try:
+        with ThreadPoolExecutor(max_workers=agent.concurrency) as executor:
+            results = list(
+                executor.map(lambda _: agent._call_lm_completion({}), range(agent.concurrency))
+            )
+    finally:
+        agent.close()
+
+    assert results == [{"choices": []}] * agent.concurrency
+    assert max_in_flight == 2
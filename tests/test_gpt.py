@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from clickup_agent.cache import LLMCache
+from clickup_agent.config import Settings
+from clickup_agent.gpt import GPTAnalyzer
+from clickup_agent.models import ClickUpTask
+
+
+def _settings(tmp_path: Path) -> Settings:
+    return Settings(
+        clickup_api_token="token",
+        clickup_custom_field_id="custom",
+        clickup_list_id="list",
+        openai_api_key="sk-test",
+        gpt_cache_path=str(tmp_path / "gpt_cache.sqlite3"),
+    )
+
+
+def test_analyze_reuses_cached_response_across_instances(tmp_path, monkeypatch) -> None:
+    response = json.dumps(
+        {
+            "complexity": "низкая",
+            "risks": ["Риск"],
+            "recommendations": ["Сделать"],
+            "optimizations": [],
+        },
+        ensure_ascii=False,
+    )
+    task = ClickUpTask(id="1", name="Task 1", description="Описание")
+
+    first = GPTAnalyzer(_settings(tmp_path))
+    generate = MagicMock(return_value=response)
+    monkeypatch.setattr(first, "_generate_response", generate)
+    try:
+        recommendation = first.analyze(task)
+    finally:
+        first.close()
+
+    second = GPTAnalyzer(_settings(tmp_path))
+    cached_generate = MagicMock(side_effect=AssertionError("cache miss"))
+    monkeypatch.setattr(second, "_generate_response", cached_generate)
+    try:
+        cached = second.analyze(task)
+    finally:
+        second.close()
+
+    assert generate.call_count == 1
+    assert cached == recommendation
+
+
+def test_llm_cache_returns_response_of_similar_embedding(tmp_path) -> None:
+    cache = LLMCache(tmp_path / "cache.sqlite3")
+    try:
+        cache.add_vector("a", [1.0, 0.0, 0.0], "first", namespace="ns")
+        cache.add_vector("b", [0.0, 1.0, 0.0], "second", namespace="ns")
+
+        assert cache.find_similar([0.99, 0.05, 0.0], threshold=0.95, namespace="ns") == "first"
+        assert cache.find_similar([0.7, 0.7, 0.0], threshold=0.95, namespace="ns") is None
+        assert cache.find_similar([1.0, 0.0, 0.0], threshold=0.95, namespace="other") is None
+    finally:
+        cache.close()
+
+    reopened = LLMCache(tmp_path / "cache.sqlite3")
+    try:
+        assert reopened.find_similar([0.0, 2.0, 0.0], threshold=0.95, namespace="ns") == "second"
+    finally:
+        reopened.close()
+
+
+def test_semantic_cache_namespace_depends_on_models(tmp_path) -> None:
+    settings = _settings(tmp_path)
+    analyzers = [
+        GPTAnalyzer(settings),
+        GPTAnalyzer(settings.model_copy(update={"openai_model": "other-chat-model"})),
+        GPTAnalyzer(
+            settings.model_copy(update={"openai_embedding_model": "text-embedding-ada-002"})
+        ),
+    ]
+    try:
+        namespaces = {analyzer._semantic_namespace for analyzer in analyzers}
+    finally:
+        for analyzer in analyzers:
+            analyzer.close()
+
+    assert len(namespaces) == 3
+
+
+def test_analyze_group_maps_results_in_order_and_rejects_wrong_length(
+    tmp_path, monkeypatch
+) -> None:
+    tasks = [ClickUpTask(id=str(index), name=f"Task {index}") for index in range(3)]
+    results = [
+        {"complexity": f"сложность {index}", "risks": [], "recommendations": [], "optimizations": []}
+        for index in range(3)
+    ]
+    analyzer = GPTAnalyzer(_settings(tmp_path).model_copy(update={"gpt_cache_path": None}))
+    generate = MagicMock(
+        side_effect=[
+            json.dumps({"results": results}, ensure_ascii=False),
+            json.dumps({"results": results[:2]}, ensure_ascii=False),
+        ]
+    )
+    monkeypatch.setattr(analyzer, "_generate_response", generate)
+    try:
+        grouped = analyzer.analyze_group(tasks)
+        mismatched = analyzer.analyze_group(tasks)
+    finally:
+        analyzer.close()
+
+    assert [item.complexity for item in grouped] == ["сложность 0", "сложность 1", "сложность 2"]
+    assert "### ЗАДАЧА 3" in generate.call_args_list[0].args[0]
+    assert mismatched == [None, None, None]
@@ -15,3 +15,33 @@ def test_markdown_formatting_creates_headers():
     assert markdown.count("###") == 4
     assert "- Риск задержки" in markdown
     assert markdown.endswith("- Автоматизировать отчётность")
+
+
+def test_markdown_strips_items_of_directly_built_recommendations():
+    recommendation = GPTRecommendation(
+        complexity=" высокая\n",
+        risks=["  Риск задержки  "],
+        recommendations=[],
+        optimizations=["Автоматизировать отчётность \n"],
+    )
+
+    markdown = recommendation.to_markdown()
+
+    assert "- высокая\n" in markdown
+    assert "- Риск задержки\n" in markdown
+    assert "- —\n" in markdown
+    assert markdown.endswith("- Автоматизировать отчётность")
+
+
+def test_markdown_reflects_updated_copies():
+    recommendation = GPTRecommendation(
+        complexity="низкая",
+        risks=[],
+        recommendations=[],
+        optimizations=[],
+    )
+    assert "### Потенциальные риски\n- —" in recommendation.to_markdown()
+
+    updated = recommendation.model_copy(update={"risks": ["Риск задержки"]})
+
+    assert "### Потенциальные риски\n- Риск задержки" in updated.to_markdown()
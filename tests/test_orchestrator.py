@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+from clickup_agent.config import Settings
+from clickup_agent.gpt import GPTAnalysisError
+from clickup_agent.models import ClickUpTask, GPTRecommendation
+from clickup_agent.orchestrator import TaskOrchestrator
+
+
+def _settings() -> Settings:
+    return Settings(
+        clickup_api_token="token",
+        clickup_custom_field_id="custom",
+        clickup_list_id="list",
+        openai_api_key="sk-test",
+        batch_size=3,
+    )
+
+
+def test_run_keeps_task_order_and_skips_failed_analysis() -> None:
+    tasks = [ClickUpTask(id=str(index), name=f"Task {index}") for index in range(7)]
+    clickup = MagicMock()
+    clickup.fetch_tasks.return_value = tasks
+
+    def analyze(task: ClickUpTask) -> GPTRecommendation:
+        if task.id == "4":
+            raise GPTAnalysisError("boom")
+        return GPTRecommendation(
+            complexity=f"сложность {task.id}",
+            risks=[],
+            recommendations=[],
+            optimizations=[],
+        )
+
+    analyzer = MagicMock()
+    analyzer.analyze.side_effect = analyze
+
+    orchestrator = TaskOrchestrator(
+        settings=_settings(), clickup_client=clickup, analyzer=analyzer
+    )
+    results = orchestrator.run()
+
+    assert [result.task.id for result in results] == ["0", "1", "2", "3", "5", "6"]
+    assert analyzer.analyze.call_count == 7
+    assert clickup.update_task_custom_field.call_count == 6
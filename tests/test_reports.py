@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
-from typing import Iterable, List, Optional
+from typing import Iterable, Iterator, List, Optional
+from zoneinfo import ZoneInfo
 
 from clickup_agent.config import Settings
 from clickup_agent.models import ClickUpTask
-from clickup_agent.reports import DailyReportGenerator
+from clickup_agent.reports import DailyReportGenerator, EmployeeReport
 
 
 class DummyClickUpClient:
@@ -43,6 +44,9 @@ class DummyClickUpClient:
 
         return list(self._tasks)
 
+    def iter_tasks(self, **kwargs) -> Iterator[ClickUpTask]:
+        yield from self.fetch_tasks(**kwargs)
+
     def close(self) -> None:  # pragma: no cover - parity with ClickUpClient
         pass
 
@@ -157,10 +161,81 @@ def test_fetch_all_tasks_filters_by_assignee_when_statuses_not_provided() -> Non
 
     assert {task.id for task in filtered_tasks} == {"closed-today", "due-today"}
     assert len(dummy_client.calls) == 2
-    first_call, second_call = dummy_client.calls
-    assert set(first_call["statuses"]) == {"closed", "complete", "completed"}
-    assert first_call["assignee"] == "123"
-    assert first_call["include_closed"] is True
-    assert set(second_call["statuses"]) == {"open", "in progress", "to do"}
-    assert second_call["assignee"] == "123"
-    assert second_call["include_closed"] is False
+    # Both queries run concurrently, so match them by include_closed, not call order.
+    calls = {call["include_closed"]: call for call in dummy_client.calls}
+    completed_call, active_call = calls[True], calls[False]
+    assert set(completed_call["statuses"]) == {"closed", "complete", "completed"}
+    assert completed_call["assignee"] == "123"
+    assert set(active_call["statuses"]) == {"open", "in progress", "to do"}
+    assert active_call["assignee"] == "123"
+
+
+def test_fetch_all_tasks_skips_tasks_returned_by_both_queries() -> None:
+    target_date = datetime(2024, 1, 10)
+    tasks = [
+        ClickUpTask(
+            id="closed-today",
+            name="Closed today",
+            status="completed",
+            date_closed=(target_date + timedelta(hours=2)).replace(tzinfo=timezone.utc),
+            assignees=[{"id": "123"}],
+        ),
+        ClickUpTask(
+            id="due-today",
+            name="Due today",
+            status="open",
+            due_date=(target_date + timedelta(hours=1)).replace(tzinfo=timezone.utc),
+            assignees=[{"id": "123"}],
+        ),
+    ]
+
+    # Both the completed and the active query return every task.
+    dummy_client = DummyClickUpClient(tasks, respect_status_argument=False)
+    generator = DailyReportGenerator(dummy_client, _make_settings())
+
+    filtered_tasks = generator._fetch_all_tasks(  # type: ignore[attr-defined]
+        target_date.replace(tzinfo=timezone.utc),
+        (target_date + timedelta(days=1)).replace(tzinfo=timezone.utc),
+    )
+
+    assert [task.id for task in filtered_tasks] == ["closed-today", "due-today"]
+    assert len(dummy_client.calls) == 2
+
+
+def test_report_header_uses_each_report_local_date() -> None:
+    moscow_midnight = datetime(2024, 1, 2, tzinfo=ZoneInfo("Europe/Moscow"))
+    same_instant_utc = moscow_midnight.astimezone(timezone.utc)
+
+    moscow_report = EmployeeReport(employee_id="1", employee_name="A", date=moscow_midnight)
+    utc_report = EmployeeReport(employee_id="1", employee_name="A", date=same_instant_utc)
+
+    assert "Отчёт за 02.01.2024" in moscow_report.to_markdown()
+    assert "Отчёт за 01.01.2024" in utc_report.to_markdown()
+
+
+def test_days_overdue_counts_calendar_days_across_dst_change() -> None:
+    settings = _make_settings()
+    settings.report_timezone = "America/New_York"
+    new_york = ZoneInfo("America/New_York")
+    # Clocks fall back on 2024-11-03, so 48.5 hours pass between the deadline
+    # and the start of the report day, but only one calendar day and 23.5 hours.
+    tasks = [
+        ClickUpTask(
+            id="due-before-dst-change",
+            name="Due before DST change",
+            status="open",
+            due_date=datetime(2024, 11, 3, 0, 30, tzinfo=new_york).astimezone(timezone.utc),
+            assignees=[{"id": "123", "username": "user"}],
+        ),
+    ]
+    generator = DailyReportGenerator(
+        DummyClickUpClient(tasks, respect_status_argument=True), settings
+    )
+
+    reports = generator.generate_reports(target_date=datetime(2024, 11, 5, 12, tzinfo=new_york))
+
+    assert len(reports) == 1
+    [task_stat] = reports[0].not_completed_tasks
+    assert task_stat.is_overdue
+    assert task_stat.days_overdue == 1
+    assert reports[0].overdue_tasks == []